@@ -18,6 +18,22 @@
 # it is needed during deprecation of the old loadData structure
 # when we remove loadData we can move all the parser functionality
 # a parsers.py module (like tools.py) and remove this if we want
-from .loaddata import load_data
+from .loaddata import (
+    load_data,
+    load_data_async,
+    load_data_chunks,
+    load_data_files,
+    load_data_files_async,
+)
+from .parsecache import ParseCache
+from .tailreader import TailReader
 
-__all__ = ["load_data"]
+__all__ = [
+    "ParseCache",
+    "TailReader",
+    "load_data",
+    "load_data_async",
+    "load_data_chunks",
+    "load_data_files",
+    "load_data_files_async",
+]
@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+##############################################################################
+#
+# (c) 2025 The Trustees of Columbia University in the City of New York.
+# All rights reserved.
+#
+# File coded by: Billinge Group members.
+#
+# See GitHub contributions for a more detailed list of contributors.
+# https://github.com/diffpy/diffpy.utils/graphs/contributors
+#
+# See LICENSE.rst for license information.
+#
+##############################################################################
+"""Column-oriented export of serialized databases for header queries."""
+
+import json
+import pathlib
+
+import numpy
+
+from .custom_exceptions import UnsupportedTypeError
+from .searchindex import _kind
+from .serialization import (
+    _array_loader,
+    _decode_entry,
+    _iter_entries,
+    supported_formats,
+)
+
+# comparison operators of ColumnarDatabase.mask
+_OPERATORS = {
+    "==": numpy.equal,
+    "!=": numpy.not_equal,
+    "<": numpy.less,
+    "<=": numpy.less_equal,
+    ">": numpy.greater,
+    ">=": numpy.greater_equal,
+    "in": numpy.isin,
+}
+
+
+def export_columnar(serial_file, columnar_file=None, fields=None):
+    """Export the headers of a database to a columnar file.
+
+    Every header field becomes one typed column with a mask of the entries
+    that have it. Fields with only booleans, only integers or only numbers
+    give bool, int64 and float64 columns, all other fields give string
+    columns with the json text of the values that are not strings. Fields
+    with both strings and numbers or booleans also get a column of the
+    numbers for the comparisons with numbers in ColumnarDatabase.mask. The
+    data columns are not copied, the columnar file references the position
+    of every entry in the database instead.
+
+    Parameters
+    ----------
+    serial_file: Path or str
+        The '.json' or '.jsonl' database file.
+    columnar_file: Path or str or None
+        The '.npz' file to write. When None, serial_file + '.columns.npz'.
+    fields: iterable of str or None
+        The header fields to export, all fields if None.
+
+    Returns
+    -------
+    ColumnarDatabase
+        The exported columnar database.
+    """
+    serial_file = pathlib.Path(serial_file)
+    if serial_file.suffix not in supported_formats:
+        raise UnsupportedTypeError(serial_file.name, supported_formats)
+    if columnar_file is None:
+        columnar_file = _columnar_file(serial_file)
+    if fields is not None:
+        fields = set(fields)
+    stat = serial_file.stat()
+
+    # later entries of a title replace earlier ones as in deserialize_data
+    rows = {}
+    for title, entry, offset in _iter_entries(serial_file, serial_file.suffix):
+        header = _decode_entry(entry, fields, True, None)
+        rows[title] = (offset, len(entry), header)
+    names = {}
+    for _, _, header in rows.values():
+        names.update(dict.fromkeys(header))
+
+    arrays = {
+        "serial_file": numpy.array(serial_file.resolve().as_posix()),
+        "source": numpy.array([stat.st_size, stat.st_mtime_ns]),
+        "titles": numpy.array(list(rows), dtype=str),
+        "offsets": numpy.array(
+            [offset for offset, _, _ in rows.values()], dtype=numpy.int64
+        ),
+        "lengths": numpy.array(
+            [length for _, length, _ in rows.values()], dtype=numpy.int64
+        ),
+        "fields": numpy.array(list(names), dtype=str),
+    }
+    for i, name in enumerate(names):
+        values = [header.get(name) for _, _, header in rows.values()]
+        column, mask = _typed_column(values)
+        # field names may hold any character, the columns are numbered
+        arrays[f"column{i}"] = column
+        arrays[f"mask{i}"] = mask
+        numbers = [value if _isnumber(value) else None for value in values]
+        if column.dtype.kind == "U" and numbers.count(None) < len(numbers):
+            column, mask = _typed_column(numbers)
+            arrays[f"numbers{i}"] = column
+            arrays[f"nmask{i}"] = mask
+    with open(columnar_file, "wb") as fp:
+        numpy.savez(fp, **arrays)
+    return ColumnarDatabase(columnar_file)
+
+
+class ColumnarDatabase(object):
+    """Header columns of a database with vectorized queries.
+
+    The columnar file is written by export_columnar. Queries compare whole
+    columns with numpy, so they take time in proportion to the number of
+    entries but do not parse the database. Only the entries that are
+    loaded are read from the database.
+
+    Parameters
+    ----------
+    columnar_file: Path or str
+        The '.npz' file written by export_columnar.
+    serial_file: Path or str or None
+        The database file, when it was moved after the export. When None,
+        the exported database is used.
+
+    Attributes
+    ----------
+    titles: ndarray
+        The titles of the entries.
+    fields: list of str
+        The names of the header columns.
+
+    Examples
+    --------
+    >>> columns = export_columnar("database.json")
+    >>> hot = columns.mask("temperature", ">", 300)
+    >>> for title in columns.titles[hot]:
+    ...     entry = columns.load(title)
+    """
+
+    def __init__(self, columnar_file, serial_file=None):
+        with numpy.load(columnar_file, allow_pickle=False) as npz:
+            arrays = dict(npz.items())
+        if serial_file is None:
+            serial_file = str(arrays["serial_file"])
+        self.serial_file = pathlib.Path(serial_file)
+        self.titles = arrays["titles"]
+        self.fields = arrays["fields"].tolist()
+        self._source = arrays["source"].tolist()
+        self._offsets = arrays["offsets"]
+        self._lengths = arrays["lengths"]
+        self._columns = {}
+        # numeric columns of the fields with both strings and numbers
+        self._numbers = {}
+        for i, name in enumerate(self.fields):
+            self._columns[name] = (arrays[f"column{i}"], arrays[f"mask{i}"])
+            if f"numbers{i}" in arrays:
+                self._numbers[name] = (
+                    arrays[f"numbers{i}"],
+                    arrays[f"nmask{i}"],
+                )
+        self._rows = {title: i for i, title in enumerate(self.titles.tolist())}
+        return
+
+    def __len__(self):
+        return len(self.titles)
+
+    def column(self, field):
+        """Return a header column.
+
+        Parameters
+        ----------
+        field: str
+            The name of the header field.
+
+        Returns
+        -------
+        numpy.ma.MaskedArray
+            The values of the field, masked for the entries without it.
+        """
+        values, present = self._columns[field]
+        return numpy.ma.MaskedArray(values, mask=~present)
+
+    def mask(self, field, operator, value):
+        """Compare a header column with a value.
+
+        Parameters
+        ----------
+        field: str
+            The name of the header field.
+        operator: str
+            One of '==', '!=', '<', '<=', '>', '>=' and 'in'. With 'in' the
+            value is a sequence of accepted values.
+        value
+            The value to compare with.
+
+        Returns
+        -------
+        ndarray
+            The boolean mask of the entries that satisfy the comparison.
+            Strings are compared with the string values of the field and
+            numbers with its numbers. Entries without such values never
+            satisfy it, entries of unknown fields neither.
+        """
+        if operator not in _OPERATORS:
+            raise ValueError(
+                f"Unknown operator {operator!r}, "
+                f"use one of {list(_OPERATORS)}."
+            )
+        if operator != "in":
+            return self._compare(field, _OPERATORS[operator], value)
+        selected = numpy.zeros(len(self), dtype=bool)
+        for kind in ("str", "number"):
+            accepted = [v for v in value if _kind(v) == kind]
+            if accepted:
+                selected |= self._compare(field, numpy.isin, accepted)
+        return selected
+
+    def _compare(self, field, operator, value):
+        """Compare the column of a field that holds values of the kind of
+        value."""
+        kind = _kind(value[0] if isinstance(value, list) else value)
+        for column in (self._columns.get(field), self._numbers.get(field)):
+            if column is None:
+                continue
+            values, present = column
+            if (values.dtype.kind == "U") == (kind == "str"):
+                return operator(values, value) & present
+        return numpy.zeros(len(self), dtype=bool)
+
+    def query(self, *conditions):
+        """Return the titles of the entries that satisfy all conditions.
+
+        Parameters
+        ----------
+        conditions: tuple
+            The triples (field, operator, value), see mask.
+
+        Returns
+        -------
+        ndarray
+            The titles of the matching entries in database order.
+
+        Examples
+        --------
+        >>> columns.query(("temperature", ">", 300), ("sample", "==", "Ni"))
+        """
+        selected = numpy.ones(len(self), dtype=bool)
+        for field, operator, value in conditions:
+            selected &= self.mask(field, operator, value)
+        return self.titles[selected]
+
+    def load(self, title):
+        """Load a complete entry from the database.
+
+        Parameters
+        ----------
+        title: str
+            The title of the entry.
+
+        Returns
+        -------
+        dict
+            The entry as given by deserialize_data.
+        """
+        row = self._rows[title]
+        stat = self.serial_file.stat()
+        if [stat.st_size, stat.st_mtime_ns] != self._source:
+            raise ValueError(
+                f"{self.serial_file} was changed after the export, "
+                "export it again."
+            )
+        with open(self.serial_file, "rb") as fp:
+            fp.seek(self._offsets[row])
+            entry = fp.read(self._lengths[row])
+        return json.loads(entry, object_hook=_array_loader(self.serial_file))
+
+
+def _columnar_file(serial_file):
+    """Return the default columnar file of a database."""
+    return serial_file.with_name(serial_file.name + ".columns.npz")
+
+
+def _isnumber(value):
+    """Return True for number and boolean header values."""
+    return isinstance(value, (bool, int, float))
+
+
+def _typed_column(values):
+    """Return the typed column and the mask of present header values."""
+    present = numpy.array([value is not None for value in values], dtype=bool)
+    types = {type(value) for value in values if value is not None}
+    if types <= {bool}:
+        dtype, fill = bool, False
+    elif types <= {int}:
+        dtype, fill = numpy.int64, 0
+    elif types <= {int, float}:
+        dtype, fill = numpy.float64, numpy.nan
+    else:
+        dtype, fill = str, ""
+        values = [
+            (
+                value
+                if isinstance(value, str) or value is None
+                else json.dumps(value)
+            )
+            for value in values
+        ]
+    try:
+        column = numpy.array(
+            [fill if value is None else value for value in values], dtype=dtype
+        )
+    except OverflowError:
+        # integers beyond int64
+        column = numpy.array(
+            [fill if value is None else value for value in values],
+            dtype=numpy.float64,
+        )
+    return column, present
@@ -13,11 +13,26 @@
 #
 ##############################################################################
 
+import asyncio
+import bz2
+import functools
+import glob
+import gzip
+import io
+import itertools
+import lzma
+import os
+import re
+import warnings
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
 from pathlib import Path
 
 import numpy
 
-from diffpy.utils import validators
 from diffpy.utils._deprecator import build_deprecation_message, deprecated
 
 base = "diffpy.utils.parsers.loaddata"
@@ -54,18 +69,29 @@ class TextDataLoader(object):
     usecols: tuple
         Which columns in our dataset to use. Ignores all other columns. If
         None (default), use all columns.
-    skiprows
-        Rows in dataset to skip. (Currently not functional.)
+    skiprows: int
+        Number of lines at the start of the file that are never data, for
+        example a numeric header. If None (default), skip no lines.
+    cache: ParseCache
+        When specified, the read method serves repeat reads of an unchanged
+        file from this on-disk cache. The datasets are then read-only.
     """
 
-    def __init__(self, minrows=10, usecols=None, skiprows=None):
+    # class defaults used when the constructor arguments are None
+    minrows = 10
+    usecols = None
+    skiprows = None
+    cache = None
+
+    def __init__(self, minrows=10, usecols=None, skiprows=None, cache=None):
         if minrows is not None:
             self.minrows = minrows
         if usecols is not None:
             self.usecols = tuple(usecols)
-        # FIXME: implement usage in _findDataBlocks
         if skiprows is not None:
             self.skiprows = skiprows
+        if cache is not None:
+            self.cache = cache
         # data items
         self._reset()
         return
@@ -79,9 +105,9 @@ class TextDataLoader(object):
 
     def _resetvars(self):
         self._filename = ""
-        self._lines = None
-        self._splitlines = None
-        self._words = None
+        self._firstline = 0
+        self._content = None
+        self._lineoffsets = None
         self._linerecs = None
         self._wordrecs = None
         return
@@ -89,12 +115,65 @@ class TextDataLoader(object):
     def read(self, filename):
         """Open a file and run readfp.
 
-        Use if file is not already open for read byte.
+        Use if file is not already open for read byte. Files compressed
+        with gzip, bzip2 or xz are decompressed on the fly.
         """
-        with open(filename, "rb") as fp:
+        if self.cache is not None:
+            args = self._cacheargs()
+            cached = self.cache.get(filename, args)
+            if cached is not None:
+                self._reset()
+                self.filename = os.fspath(filename)
+                self.headers, self.datasets = cached
+                return
+        with _open_data_file(filename) as fp:
             self.readfp(fp)
+        if self.cache is not None:
+            self.cache.put(filename, args, self.headers, self.datasets)
         return
 
+    async def read_async(self, filename, executor=None):
+        """Read a file as in read without blocking the event loop.
+
+        The file is read in the default executor of the running loop and
+        its data blocks are found in executor.
+
+        Parameters
+        ----------
+        filename: Path or str
+            The name of the file, possibly compressed.
+        executor: concurrent.futures.Executor
+            The executor that runs the parsing. If None (default), use the
+            default executor of the loop.
+        """
+        loop = asyncio.get_running_loop()
+        args = self._cacheargs()
+        if self.cache is not None:
+            cached = await loop.run_in_executor(
+                None, self.cache.get, filename, args
+            )
+            if cached is not None:
+                self._reset()
+                self.filename = os.fspath(filename)
+                self.headers, self.datasets = cached
+                return
+        content = await loop.run_in_executor(None, _read_data_file, filename)
+        headers, datasets = await loop.run_in_executor(
+            executor, _find_text_blocks, content, *args[1:]
+        )
+        self._reset()
+        self.filename = os.fspath(filename)
+        self.headers = headers
+        self.datasets = datasets
+        if self.cache is not None:
+            await loop.run_in_executor(
+                None, self.cache.put, filename, args, headers, datasets
+            )
+        return
+
+    def _cacheargs(self):
+        return ("TextDataLoader", self.minrows, self.usecols, self.skiprows)
+
     def readfp(self, fp, append=False):
         """Get file details.
 
@@ -105,22 +184,32 @@ class TextDataLoader(object):
             contain column name information).
         """
         self._reset()
-        # try to read lines from fp first
-        self._lines = fp.readlines()
+        # try to read the content from fp first
+        content = fp.read()
+        if isinstance(content, str):
+            content = content.encode()
+        self._content = content
         # and if good, assign filename
         self.filename = getattr(fp, "name", "")
-        self._words = "".join(self._lines).split()
-        self._splitlines = [line.split() for line in self._lines]
+        self._tokenize()
         self._findDataBlocks()
         return
 
-    def _findDataBlocks(self):
-        mincols = 1
-        if self.usecols is not None and len(self.usecols):
-            mincols = max(mincols, max(self.usecols) + 1)
-            mincols = max(mincols, abs(min(self.usecols)))
-        nlines = len(self._lines)
-        nwords = len(self._words)
+    def _tokenize(self):
+        """Build the line and word records in one vectorized pass over
+        the file content."""
+        buf = numpy.frombuffer(self._content, dtype=numpy.uint8)
+        inword = numpy.zeros(len(buf) + 2, dtype=numpy.int8)
+        inword[1:-1] = ~_WHITESPACE[buf]
+        edges = numpy.diff(inword)
+        wbeg = numpy.flatnonzero(edges == 1)
+        wend = numpy.flatnonzero(edges == -1)
+        newlines = numpy.flatnonzero(buf == ord("\n"))
+        self._lineoffsets = numpy.r_[0, newlines + 1]
+        if self._lineoffsets[-1] < len(buf):
+            self._lineoffsets = numpy.r_[self._lineoffsets, len(buf)]
+        nlines = len(self._lineoffsets) - 1
+        nwords = len(wbeg)
         # idx - line index, nw0, nw1 - index of the first and last word,
         # nf - number of words, ok - has data
         self._linerecs = numpy.recarray(
@@ -133,85 +222,284 @@ class TextDataLoader(object):
                 ("ok", bool),
             ],
         )
-        lr = self._linerecs
-        lr.idx = numpy.arange(nlines)
-        lr.nf = [len(sl) for sl in self._splitlines]
-        lr.nw1 = lr.nf.cumsum()
-        lr.nw0 = lr.nw1 - lr.nf
-        lr.ok = True
-        # word records
-        lw = self._wordrecs = numpy.recarray(
+        # word records, beg and end are the byte offsets of each word
+        self._wordrecs = numpy.recarray(
             (nwords,),
             dtype=[
                 ("idx", int),
                 ("line", int),
                 ("col", int),
+                ("beg", int),
+                ("end", int),
                 ("ok", bool),
                 ("value", float),
             ],
         )
+        lr = self._linerecs
+        lw = self._wordrecs
         lw.idx = numpy.arange(nwords)
-        n1 = numpy.zeros(nwords, dtype=bool)
-        n1[lr.nw1[:-1]] = True
-        lw.line = n1.cumsum()
+        lw.beg = wbeg
+        lw.end = wend
+        lw.line = numpy.searchsorted(newlines, wbeg)
+        lr.idx = numpy.arange(nlines)
+        lr.nf = numpy.bincount(lw.line, minlength=nlines)
+        lr.nw1 = lr.nf.cumsum()
+        lr.nw0 = lr.nw1 - lr.nf
+        lr.ok = True
         lw.col = lw.idx - lr.nw0[lw.line]
-        lw.ok = True
-        values = nwords * [0.0]
-        for i, w in enumerate(self._words):
-            try:
-                values[i] = float(w)
-            except ValueError:
-                lw.ok[i] = False
-        # prune lines that have a non-float values:
-        lw.values = values
+        return
+
+    def iterread(self, filename, chunksize=2**20):
+        """Open a file, possibly compressed, and iterate over its data
+        blocks with iterfp."""
+        with _open_data_file(filename) as fp:
+            yield from self.iterfp(fp, chunksize)
+        return
+
+    def iterfp(self, fp, chunksize=2**20):
+        """Iterate over the data blocks of an open file.
+
+        The file is read in chunks of chunksize bytes and every data block
+        is yielded as soon as the line that ends it was read. Only the
+        current block and its header are kept in memory, the headers and
+        datasets attributes stay empty.
+
+        Parameters
+        ----------
+        fp
+            The file object opened for reading.
+        chunksize: int
+            The number of bytes to read at a time. (Default 1 MiB.)
+
+        Yields
+        ------
+        header: str
+            The text preceding the data block.
+        dataset: ndarray
+            The data block, empty for the text after the last block.
+        """
+        self._reset()
+        self.filename = getattr(fp, "name", "")
+        pending = b""
+        readsize = chunksize
+        final = False
+        while not final:
+            chunk = fp.read(readsize)
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            final = not chunk
+            content = pending + chunk
+            # only process complete lines until the end of file
+            cut = len(content) if final else content.rfind(b"\n") + 1
+            self._content = content[:cut]
+            self._tokenize()
+            consumed = self._findDataBlocks(final=final)
+            blocks = list(zip(self.headers, self.datasets))
+            self.headers = []
+            self.datasets = []
+            yield from blocks
+            pending = content[self._lineoffsets[consumed] :]
+            self._firstline += consumed
+            # read more at once while blocks are long to keep the rescans
+            # of pending content linear in the file size
+            readsize = max(chunksize, len(pending))
+        self._resetvars()
+        return
+
+    def _findDataBlocks(self, final=True):
+        """Append all data blocks of the content to datasets and their
+        headers to headers.
+
+        If final is False, more content may follow, so stop before the
+        last block if it reaches the end of the content, and do not
+        append the text after the last block. Return the index of the
+        first line that was not used.
+        """
+        mincols = 1
+        if self.usecols is not None and len(self.usecols):
+            mincols = max(mincols, max(self.usecols) + 1)
+            mincols = max(mincols, abs(min(self.usecols)))
+        lr = self._linerecs
+        lw = self._wordrecs
+        # only convert the words in the used columns
         if self.usecols is None:
-            badlines = lw.line[~lw.ok]
-            lr.ok[badlines] = False
+            lw.value, lw.ok = _tofloats(self._content, lw.beg, lw.end)
         else:
+            used = numpy.zeros(len(lw), dtype=bool)
             for col in self.usecols:
-                badlines = lw.line[(lw.col == col) & ~lw.ok]
-                lr.ok[badlines] = False
+                if col < 0:
+                    col = lr.nf[lw.line] + col
+                used |= lw.col == col
+            lw.value = numpy.nan
+            lw.ok = True
+            lw.value[used], lw.ok[used] = _tofloats(
+                self._content, lw.beg[used], lw.end[used]
+            )
+        # prune lines that have a non-float values:
+        lr.ok[lw.line[~lw.ok]] = False
+        # and the leading lines that are skipped
+        if self.skiprows:
+            lr.ok[: max(0, self.skiprows - self._firstline)] = False
         lr1 = lr[lr.nf >= mincols]
-        okb = numpy.r_[lr1.ok[:1], lr1.ok[1:] & ~lr1.ok[:-1], False]
-        oke = numpy.r_[False, ~lr1.ok[1:] & lr1.ok[:-1], lr1.ok[-1:]]
-        blockb = numpy.r_[True, lr1.nf[1:] != lr1.nf[:-1], False]
-        blocke = numpy.r_[False, blockb[1:-1], True]
-        beg = numpy.nonzero(okb | blockb)[0]
-        end = numpy.nonzero(oke | blocke)[0]
-        rowcounts = end - beg
-        assert not numpy.any(rowcounts < 0)
-        goodrows = rowcounts >= self.minrows
-        begend = numpy.transpose([beg, end - 1])[goodrows]
+        # data blocks are runs of good lines with the same number of words
+        runb = numpy.ones(len(lr1), dtype=bool)
+        runb[1:] = (lr1.ok[1:] != lr1.ok[:-1]) | (lr1.nf[1:] != lr1.nf[:-1])
+        beg = numpy.flatnonzero(runb)
+        end = numpy.empty_like(beg)
+        end[:-1] = beg[1:] - 1
+        end[-1:] = len(lr1) - 1
+        rowcounts = end - beg + 1
+        goodrows = lr1.ok[beg] & (rowcounts >= self.minrows)
         hbeg = 0
-        for dbeg, dend in begend:
-            bb1 = lr1[dbeg]
-            ee1 = lr1[dend]
-            hend = bb1.idx
-            header = "".join(self._lines[hbeg:hend])
-            hbeg = ee1.idx + 1
-            if self.usecols is None:
-                data = numpy.reshape(lw.value[bb1.nw0 : ee1.nw1], (-1, bb1.nf))
-            else:
-                tdata = numpy.empty(
-                    (len(self.usecols), dend - dbeg), dtype=float
-                )
-                for j, trow in zip(self.usecols, tdata):
-                    j %= bb1.nf
-                    trow[:] = lw.value[bb1.nw0 + j : ee1.nw1 : bb1.nf]
-                data = tdata.transpose()
+        for dbeg, dend in zip(beg[goodrows], end[goodrows]):
+            if not final and dend == len(lr1) - 1:
+                break
+            rows = lr1[dbeg : dend + 1]
+            nf = rows.nf[0]
+            hend = rows.idx[0]
+            header = self._linetext(hbeg, hend)
+            hbeg = rows.idx[-1] + 1
+            # lines skipped by the mincols filter may sit inside the block,
+            # so gather the words line by line
+            data = lw.value[rows.nw0[:, numpy.newaxis] + numpy.arange(nf)]
+            if self.usecols is not None:
+                data = data[:, [j % nf for j in self.usecols]]
             self.headers.append(header)
             self.datasets.append(data)
         # finish reading to a last header and empty dataset
-        if hbeg < len(self._lines):
-            header = "".join(self._lines[hbeg:])
+        if final and hbeg < len(lr):
+            header = self._linetext(hbeg, len(lr))
             data = numpy.empty(0, dtype=float)
             self.headers.append(header)
             self.datasets.append(data)
-        return
+            hbeg = len(lr)
+        return hbeg
+
+    def _linetext(self, lbeg, lend):
+        """Return the text of lines lbeg to lend (exclusive)."""
+        offsets = self._lineoffsets
+        return self._content[offsets[lbeg] : offsets[lend]].decode(
+            errors="replace"
+        )
+
+
+def _find_text_blocks(content, minrows, usecols, skiprows):
+    """Return the headers and datasets that TextDataLoader finds in
+    content."""
+    loader = TextDataLoader(minrows, usecols, skiprows)
+    loader.readfp(io.BytesIO(content))
+    return loader.headers, loader.datasets
+
+
+# byte classes used by the vectorized tokenizer
+_WHITESPACE = numpy.zeros(256, dtype=bool)
+_WHITESPACE[list(b" \t\n\r\x0b\x0c")] = True
+# bytes that cannot appear in a plain decimal or exponent number
+_NONNUMERIC = ~_WHITESPACE
+_NONNUMERIC[list(b"0123456789+-.eE")] = False
+
+
+def _tofloats(content, wbeg, wend):
+    """Convert words of a byte string to floats in bulk.
+
+    Words made of digits, signs, dots and exponents are split out of a copy
+    of the content where all other words are blanked and converted with one
+    numpy call. Only the remaining words, for example 'nan' or header text,
+    are converted one by one.
+
+    Parameters
+    ----------
+    content: bytes
+        The text holding the words.
+    wbeg: ndarray
+        The byte offsets where the words begin.
+    wend: ndarray
+        The byte offsets where the words end.
+
+    Returns
+    -------
+    values: ndarray
+        The float values of the words, NaN for non-numeric words.
+    ok: ndarray
+        The boolean mask of words that could be converted.
+    """
+    if 2 * numpy.sum(wend - wbeg) < len(content):
+        # a few selected words, do not scan all of the content
+        content, wbeg, wend = _gatherwords(content, wbeg, wend)
+    nwords = len(wbeg)
+    values = numpy.full(nwords, numpy.nan)
+    ok = numpy.zeros(nwords, dtype=bool)
+    buf = numpy.frombuffer(content, dtype=numpy.uint8)
+    bad = numpy.append(_NONNUMERIC[buf], False)
+    plain = numpy.zeros(nwords, dtype=bool)
+    if nwords:
+        bounds = numpy.column_stack([wbeg, wend]).ravel()
+        plain = ~numpy.logical_or.reduceat(bad, bounds)[::2]
+    slow = ~plain
+    if plain.any():
+        # blank everything but the plain words
+        keep = numpy.zeros(len(buf) + 1, dtype=numpy.int8)
+        keep[wbeg[plain]] = 1
+        keep[wend[plain]] = -1
+        keep = numpy.cumsum(keep[:-1], dtype=numpy.int8).view(bool)
+        text = numpy.where(keep, buf, numpy.uint8(ord(" "))).tobytes()
+        values[plain], ok[plain] = _bulkfloats(text.split())
+    for i in numpy.flatnonzero(slow):
+        try:
+            values[i] = float(content[wbeg[i] : wend[i]])
+            ok[i] = True
+        except ValueError:
+            pass
+    return values, ok
+
+
+def _bulkfloats(words):
+    """Convert a list of plain words to floats and their success mask.
+
+    Malformed words such as '1-2', '1.2.3' or a '-----' separator make the
+    bulk conversion fail. The words are then halved until the malformed
+    ones are found, so the other words are still converted in bulk.
+    """
+    try:
+        return numpy.array(words, dtype=float), numpy.ones(len(words), bool)
+    except ValueError:
+        pass
+    if len(words) == 1:
+        try:
+            return numpy.array([float(words[0])]), numpy.ones(1, bool)
+        except ValueError:
+            return numpy.array([numpy.nan]), numpy.zeros(1, bool)
+    mid = len(words) // 2
+    head, headok = _bulkfloats(words[:mid])
+    tail, tailok = _bulkfloats(words[mid:])
+    return numpy.concatenate([head, tail]), numpy.concatenate([headok, tailok])
+
+
+def _gatherwords(content, wbeg, wend):
+    """Copy words of a byte string to a new string separated by single
+    spaces and return it with the new word offsets."""
+    lengths = wend - wbeg
+    nwords = len(lengths)
+    # exclusive cumulative length, where each word starts without spaces
+    cumlen = numpy.cumsum(lengths) - lengths
+    pos = numpy.arange(numpy.sum(lengths))
+    src = pos + numpy.repeat(wbeg - cumlen, lengths)
+    dst = pos + numpy.repeat(numpy.arange(nwords), lengths)
+    buf = numpy.full(len(pos) + nwords, ord(" "), dtype=numpy.uint8)
+    buf[dst] = numpy.frombuffer(content, dtype=numpy.uint8)[src]
+    gbeg = cumlen + numpy.arange(nwords)
+    return buf.tobytes(), gbeg, gbeg + lengths
 
 
 def load_data(
-    filename, minrows=10, headers=False, hdel="=", hignore=None, **kwargs
+    filename,
+    minrows=10,
+    headers=False,
+    hdel="=",
+    hignore=None,
+    with_data=False,
+    cache=None,
+    **kwargs,
 ):
     """Find and load data from a text file.
 
@@ -222,7 +510,9 @@ def load_data(
     Parameters
     ----------
     filename: Path or string
-        Name of the file we want to load data from.
+        Name of the file we want to load data from. Files compressed with
+        gzip, bzip2 or xz are recognized by their content and decompressed
+        on the fly.
     minrows: int
         Minimum number of rows in the first data block. All rows must have
         the same number of floating point values.
@@ -241,6 +531,16 @@ def load_data(
         (Only used when headers enabled.) Ignore header rows beginning with
         any elements in hignore. e.g. hignore=['# ', '['] causes the
         following lines to be skipped: '# qmax=10', '[defaults]'.
+    with_data: bool
+        (Only used when headers enabled.) When True, return both the header
+        dictionary and the data block, read in a single pass over the file.
+        Default False.
+    cache: ParseCache
+        When specified, look up the parsed result in this on-disk cache and
+        store it there after parsing. Entries are keyed by the file path,
+        size and modification time and by the parse arguments, so repeat
+        loads of an unchanged file only map the stored arrays. The returned
+        data block is then read-only. Default None.
     kwargs:
         Keyword arguments that are passed to numpy.loadtxt including the
         following arguments below. (See numpy.loadtxt for more details.) Only
@@ -267,17 +567,368 @@ def load_data(
     -------
     data_block: ndarray
         A numpy array containing the found data block. (This is not returned
-        if headers is enabled.)
+        if headers is enabled, unless with_data is also enabled.)
     hdata: dict
         If headers are enabled, return a dictionary of parameters read from
-        the header.
+        the header. With with_data enabled, the pair (hdata, data_block) is
+        returned.
+    """
+    filename = _check_data_file(filename)
+    if cache is not None:
+        args = ("load_data", minrows, headers, hdel, hignore, with_data)
+        args += (sorted(kwargs.items()),)
+        cached = cache.get(filename, args)
+        if cached is None:
+            result = load_data(
+                filename,
+                minrows,
+                headers,
+                hdel,
+                hignore,
+                with_data,
+                **kwargs,
+            )
+            if not headers:
+                cache.put(filename, args, None, [result])
+            elif with_data:
+                cache.put(filename, args, result[0], [result[1]])
+            else:
+                cache.put(filename, args, result, [])
+            return result
+        hdata, arrays = cached
+        if headers and not with_data:
+            return hdata
+        return (hdata, arrays[0]) if headers else arrays[0]
+    # make sure fid gets cleaned up
+    with _open_data_file(filename) as fid:
+        return _parse_data_file(
+            fid, minrows, headers, hdel, hignore, with_data, kwargs
+        )
+
+
+def load_data_chunks(filename, chunksize=100000, minrows=10, **kwargs):
+    """Iterate over the data block of a text file in chunks of rows.
+
+    The data block is found as in load_data, then read chunksize rows at a
+    time, so files of any size are processed in constant memory.
+
+    Parameters
+    ----------
+    filename: Path or string
+        Name of the file we want to load data from, possibly compressed as
+        in load_data.
+    chunksize: int
+        Maximum number of rows in each chunk. (Default 100000.)
+    minrows: int
+        Minimum number of rows in the first data block. All rows must have
+        the same number of floating point values.
+    kwargs:
+        Keyword arguments that are passed to numpy.loadtxt, see load_data.
+
+    Yields
+    ------
+    chunk: ndarray
+        The next rows of the data block. Chunks are always two-dimensional,
+        a block of one column gives chunks of shape (nrows, 1).
+    """
+    filename = _check_data_file(filename)
+    kwargs.setdefault("ndmin", 2)
+    with _open_data_file(filename) as fid:
+        _, start, ncvblock, _ = _find_data_block(
+            fid, minrows, False, None, None, kwargs
+        )
+        if start is None:
+            return
+        fid.seek(start)
+        while True:
+            lines = list(itertools.islice(fid, chunksize))
+            if not lines:
+                break
+            with warnings.catch_warnings():
+                # chunks of blank or comment lines hold no data
+                warnings.simplefilter("ignore", UserWarning)
+                chunk = _read_data_block(lines, start, ncvblock, kwargs)
+            if chunk.size:
+                yield chunk
+    return
+
+
+def load_data_files(
+    files,
+    max_workers=None,
+    use_processes=False,
+    ordered=True,
+    chunksize=None,
+    **kwargs,
+):
+    """Load many text files with load_data in a pool of workers.
+
+    Errors are collected per file instead of raised, so one bad file does
+    not abort the batch.
+
+    Parameters
+    ----------
+    files: str, Path or iterable
+        A glob pattern such as 'data/*.gr' or the names of the files.
+    max_workers: int
+        The maximum number of files loaded at the same time. If None
+        (default), use the default of the executor.
+    use_processes: bool
+        When True, load the files in a pool of processes instead of
+        threads. (Default False.)
+    ordered: bool
+        When True (default), the results are in the order of files,
+        otherwise in the order the loading completed.
+    chunksize: int
+        The number of files each worker loads per task. If None (default),
+        split the files into about four tasks per worker.
+    kwargs:
+        Keyword arguments that are passed to load_data.
+
+    Returns
+    -------
+    results: dict
+        The value returned by load_data for each file that loaded.
+    errors: dict
+        The exception raised for each file that failed to load.
+    """
+    if isinstance(files, (str, os.PathLike)):
+        files = sorted(glob.glob(os.fspath(files)))
+    files = list(files)
+    if use_processes:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    if chunksize is None:
+        nworkers = max_workers or os.cpu_count() or 1
+        chunksize = max(1, len(files) // (4 * nworkers))
+    with executor:
+        futures = [
+            executor.submit(_load_data_batch, files[i : i + chunksize], kwargs)
+            for i in range(0, len(files), chunksize)
+        ]
+        if not ordered:
+            futures = as_completed(futures)
+        results = {}
+        errors = {}
+        for future in futures:
+            for filename, data, error in future.result():
+                if error is None:
+                    results[filename] = data
+                else:
+                    errors[filename] = error
+    return results, errors
+
+
+def _load_data_batch(files, kwargs):
+    """Load a batch of files and return (filename, data, error) for
+    each."""
+    loaded = []
+    for filename in files:
+        try:
+            loaded.append((filename, load_data(filename, **kwargs), None))
+        except Exception as error:
+            loaded.append((filename, None, error))
+    return loaded
+
+
+async def load_data_async(
+    filename,
+    minrows=10,
+    headers=False,
+    hdel="=",
+    hignore=None,
+    with_data=False,
+    executor=None,
+    **kwargs,
+):
+    """Find and load data from a text file without blocking the event
+    loop.
+
+    The file is read in the default executor of the running loop and
+    parsed in executor, so a pool of processes can take the parsing off
+    the interpreter of the loop.
+
+    Parameters
+    ----------
+    filename: Path or string
+        Name of the file we want to load data from.
+    minrows, headers, hdel, hignore, with_data
+        The data block and header options of load_data.
+    executor: concurrent.futures.Executor
+        The executor that runs the parsing. If None (default), use the
+        default executor of the loop.
+    kwargs:
+        Keyword arguments that are passed to numpy.loadtxt, see load_data.
+
+    Returns
+    -------
+    The data block, the header data or both as returned by load_data.
+    """
+    loop = asyncio.get_running_loop()
+    content = await loop.run_in_executor(None, _read_data_file, filename)
+    parse = functools.partial(
+        _parse_data_bytes,
+        content,
+        minrows,
+        headers,
+        hdel,
+        hignore,
+        with_data,
+        kwargs,
+    )
+    return await loop.run_in_executor(executor, parse)
+
+
+async def load_data_files_async(
+    files, max_concurrency=8, executor=None, **kwargs
+):
+    """Load many text files with load_data_async.
+
+    At most max_concurrency files are read and parsed at the same time, so
+    a large batch neither floods the executors nor holds the content of
+    all files in memory. Errors are collected per file as in
+    load_data_files.
+
+    Parameters
+    ----------
+    files: str, Path or iterable
+        A glob pattern such as 'data/*.gr' or the names of the files.
+    max_concurrency: int
+        The maximum number of files loaded at the same time. (Default 8.)
+    executor: concurrent.futures.Executor
+        The executor that runs the parsing. If None (default), use the
+        default executor of the loop.
+    kwargs:
+        Keyword arguments that are passed to load_data_async.
+
+    Returns
+    -------
+    results: dict
+        The value returned by load_data for each file that loaded, in the
+        order of files.
+    errors: dict
+        The exception raised for each file that failed to load.
+    """
+    if isinstance(files, (str, os.PathLike)):
+        files = sorted(glob.glob(os.fspath(files)))
+    files = list(files)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def load(filename):
+        async with semaphore:
+            return await load_data_async(filename, executor=executor, **kwargs)
+
+    loaded = await asyncio.gather(
+        *(load(filename) for filename in files), return_exceptions=True
+    )
+    results = {}
+    errors = {}
+    for filename, data in zip(files, loaded):
+        if isinstance(data, Exception):
+            errors[filename] = data
+        else:
+            results[filename] = data
+    return results, errors
+
+
+def _check_data_file(filename):
+    """Check if file exists before trying to open it."""
+    filename = Path(filename)
+    if not filename.is_file():
+        raise IOError(
+            (
+                f"File {str(filename)} cannot be found. "
+                "Please rerun the program specifying a valid filename."
+            )
+        )
+    return filename
+
+
+# leading bytes of the compressed formats and their readers
+_COMPRESSED_FORMATS = (
+    (b"\x1f\x8b", gzip.open),
+    (b"BZh", bz2.open),
+    (b"\xfd7zXZ\x00", lzma.open),
+)
+
+
+def _open_data_file(filename):
+    """Open a data file for binary reading.
+
+    Compressed files are detected from their leading bytes and opened
+    with a reader that decompresses them as they are read.
     """
-    from numpy import array, loadtxt
+    fid = open(filename, "rb")
+    magic = fid.peek(6)[:6]
+    for prefix, opener in _COMPRESSED_FORMATS:
+        if magic.startswith(prefix):
+            fid.close()
+            return opener(filename, "rb")
+    return fid
+
+
+def _read_data_file(filename):
+    """Return the decompressed content of a data file."""
+    filename = _check_data_file(filename)
+    with _open_data_file(filename) as fid:
+        return fid.read()
+
 
+def _parse_data_file(fid, minrows, headers, hdel, hignore, with_data, kwargs):
+    """Parse an open binary data file as in load_data."""
+    hdata, start, ncvblock, nskip = _find_data_block(
+        fid, minrows, headers, hdel, hignore, kwargs
+    )
+    # Return header data if requested
+    if headers and not with_data:
+        return hdata  # Return, so do not proceed to reading datablock
+    if start is not None and isinstance(fid, io.BufferedReader):
+        # loadtxt reads a plain file by its path fastest, it splits the
+        # lines in C instead of taking them one by one from Python
+        kwargs = dict(kwargs)
+        kwargs["skiprows"] = nskip + kwargs.get("skiprows", 0)
+        # the lines before the block may not be valid UTF-8
+        kwargs.setdefault("encoding", "latin1")
+        data_block = _read_data_block(fid.name, start, ncvblock, kwargs)
+    else:
+        fid.seek(start or 0)
+        data_block = _read_data_block(fid, start, ncvblock, kwargs)
+    if headers:
+        return hdata, data_block
+    return data_block
+
+
+def _parse_data_bytes(content, *args):
+    """Parse the content of a data file as in load_data."""
+    return _parse_data_file(io.BytesIO(content), *args)
+
+
+def _find_data_block(lines, minrows, headers, hdel, hignore, kwargs):
+    """Scan binary lines for header data and the start of the data
+    block.
+
+    The scan stops as soon as minrows rows of the data block were seen, so
+    its cost does not depend on the size of the data. Lines are only decoded
+    when header data are requested.
+
+    Returns
+    -------
+    hdata: dict
+        The header data, empty unless headers is True.
+    start: int or None
+        The byte offset of the data block or None if there is no block.
+    ncvblock: tuple
+        The number of columns and of used values in the block rows.
+    nskip: int or None
+        The number of lines before the data block.
+    """
     # for storing header data
     hdata = {}
     # determine the arguments
     delimiter = kwargs.get("delimiter")
+    if isinstance(delimiter, str):
+        delimiter = delimiter.encode()
     usecols = kwargs.get("usecols")
     # required at least one column of floating point values
     mincv = (1, 1)
@@ -304,86 +955,101 @@ def load_data(
             nc = nv = 0
         return nc, nv
 
-    # Check if file exists before trying to open
-    filename = Path(filename)
-    if not filename.is_file():
-        raise IOError(
-            (
-                f"File {str(filename)} cannot be found. "
-                "Please rerun the program specifying a valid filename."
-            )
-        )
+    parseheader = _header_parser(hdel, tuple(hignore or ()))
+    # search for the start of datablock
+    start = ncvblock = nskip = None
+    fpos = (0, 0)
+    nrows = 0
+    for lineno, line in enumerate(lines):
+        # find header information if requested
+        if headers:
+            hpair = parseheader(line.decode(errors="replace"))
+            if hpair is not None:
+                hdata[hpair[0]] = hpair[1]
+        # continue search for the start of datablock
+        fpos = (fpos[1], fpos[1] + len(line))
+        ncv = countcolumnsvalues(line)
+        if ncv < mincv:
+            start = None
+            continue
+        # ncv is acceptable here, require the same number of columns
+        # throughout the datablock
+        if start is None or ncv != ncvblock:
+            ncvblock = ncv
+            nrows = 0
+            start = fpos[0]
+            nskip = lineno
+        nrows += 1
+        # block was found here!
+        if nrows >= minrows:
+            break
+    if start is None:
+        nskip = None
+    return hdata, start, ncvblock, nskip
 
-    # make sure fid gets cleaned up
-    with open(filename, "rb") as fid:
-        # search for the start of datablock
-        start = ncvblock = None
-        fpos = (0, 0)
-        nrows = 0
-        for line in fid:
-            # decode line
-            dline = line.decode()
-            # find header information if requested
-            if headers:
-                hpair = dline.split(hdel)
-                flag = True
-                # ensure number of non-blank arguments is two
-                if len(hpair) != 2:
-                    flag = False
-                else:
-                    # ignore if an argument is blank
-                    hpair[0] = hpair[0].strip()  # name of data entry
-                    hpair[1] = hpair[1].strip()  # value of entry
-                    if not hpair[0] or not hpair[1]:
-                        flag = False
-                    else:
-                        # check if row has an ignore tag
-                        if hignore is not None:
-                            for tag in hignore:
-                                taglen = len(tag)
-                                if (
-                                    len(hpair[0]) >= taglen
-                                    and hpair[0][:taglen] == tag
-                                ):
-                                    flag = False
-                # add header data
-                if flag:
-                    name = hpair[0]
-                    value = hpair[1]
-                    # check if data value should be stored as float
-                    if validators.is_number(hpair[1]):
-                        value = float(hpair[1])
-                    hdata.update({name: value})
-            # continue search for the start of datablock
-            fpos = (fpos[1], fpos[1] + len(line))
-            line = dline
-            ncv = countcolumnsvalues(line)
-            if ncv < mincv:
-                start = None
-                continue
-            # ncv is acceptable here, require the same number of columns
-            # throughout the datablock
-            if start is None or ncv != ncvblock:
-                ncvblock = ncv
-                nrows = 0
-                start = fpos[0]
-            nrows += 1
-            # block was found here!
-            if nrows >= minrows:
-                break
 
-        # Return header data if requested
-        if headers:
-            return hdata  # Return, so do not proceed to reading datablock
+# Python float syntax, including digit separators, inf and nan
+_FLOAT_REGEX = re.compile(
+    r"""[+-]?(?:
+        (?:\d(?:_?\d)*(?:\.(?:\d(?:_?\d)*)?)?|\.\d(?:_?\d)*)
+        (?:[eE][+-]?\d(?:_?\d)*)?
+        |(?i:inf(?:inity)?|nan)
+    )""",
+    re.VERBOSE,
+)
 
-        # Return an empty array when no data found.
-        # loadtxt would otherwise raise an exception on loading from EOF.
-        if start is None:
-            data_block = array([], dtype=float)
-        else:
-            fid.seek(start)
-            # always use usecols argument so that loadtxt does not crash
-            # in case of trailing delimiters.
-            kwargs.setdefault("usecols", list(range(ncvblock[0])))
-            data_block = loadtxt(fid, **kwargs)
-    return data_block
+
+@functools.lru_cache(maxsize=32)
+def _header_parser(hdel, hignore):
+    """Return a function that parses header lines for the delimiter hdel
+    and the tuple of ignored tags hignore.
+
+    The function returns the pair (name, value) for lines with exactly one
+    delimiter between a non-blank name and value, where value is a float
+    when it is a number, and None for all other lines.
+    """
+    if hdel is None:
+        # str.split(None) splits on runs of whitespace
+        pairregex = re.compile(r"\s*(\S+)\s+(\S+)\s*")
+    else:
+        # a part is text where no delimiter begins, split as
+        # runs without the first delimiter character
+        first = re.escape(hdel[0])
+        part = f"([^{first}]*+"
+        if len(hdel) > 1:
+            part += f"(?:{first}(?!{re.escape(hdel[1:])})[^{first}]*+)*+"
+        part += ")"
+        pairregex = re.compile(part + re.escape(hdel) + part, re.DOTALL)
+    matchpair = pairregex.fullmatch
+    isfloat = _FLOAT_REGEX.fullmatch
+
+    def parseheader(line):
+        match = matchpair(line)
+        if match is None:
+            return None
+        name = match.group(1).strip()
+        value = match.group(2).strip()
+        if not name or not value or name.startswith(hignore):
+            return None
+        if isfloat(value):
+            value = float(value)
+        return name, value
+
+    return parseheader
+
+
+def _read_data_block(lines, start, ncvblock, kwargs):
+    """Parse the data block from binary lines that begin at its start, or
+    from a file path with the lines before the block in skiprows.
+
+    The whole block is parsed by the C reader of numpy.loadtxt in one call.
+    """
+    # Return an empty array when no data found.
+    # loadtxt would otherwise raise an exception on loading from EOF.
+    if start is None:
+        return numpy.array([], dtype=float)
+    # always use usecols argument so that loadtxt does not crash
+    # in case of trailing delimiters.
+    kwargs = dict(kwargs)
+    kwargs.setdefault("usecols", list(range(ncvblock[0])))
+    return numpy.loadtxt(lines, **kwargs)
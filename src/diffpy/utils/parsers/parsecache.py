@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+##############################################################################
+#
+# (c) 2025 The Trustees of Columbia University in the City of New York.
+# All rights reserved.
+#
+# File coded by: Billinge Group members.
+#
+# See GitHub contributions for a more detailed list of contributors.
+# https://github.com/diffpy/diffpy.utils/graphs/contributors
+#
+# See LICENSE.rst for license information.
+#
+##############################################################################
+"""Persistent on-disk cache for parsed text data files."""
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy
+
+
+class ParseCache(object):
+    """On-disk cache of parsed text data files.
+
+    Each entry is keyed by the resolved path, size and modification time of
+    the source file together with the arguments used to parse it, so an
+    edited file is never served from a stale entry. Arguments that hold
+    functions, such as the converters of numpy.loadtxt, have no stable key
+    and are not cached. The parsed arrays are
+    stored as ``.npy`` files and returned as read-only memory maps, the
+    header information is stored in a JSON file next to them. When the
+    total size exceeds max_bytes, the least recently used entries are
+    evicted.
+
+    Parameters
+    ----------
+    directory: Path or str
+        The directory that holds the cache entries. It is created if it does
+        not exist.
+    max_bytes: int
+        The maximum total size of the cached arrays. (Default 1 GiB.)
+
+    Examples
+    --------
+    >>> cache = ParseCache("~/.cache/diffpy-parsers")
+    >>> data = load_data("scan.gr", cache=cache)  # parsed and stored
+    >>> data = load_data("scan.gr", cache=cache)  # loaded from the cache
+    """
+
+    def __init__(self, directory, max_bytes=2**30):
+        self.directory = Path(directory).expanduser()
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # running total of the entry sizes, counted on the first put
+        self._nbytes = None
+        self._puts = 0
+        return
+
+    def get(self, filename, args):
+        """Look up the parsed content of a file.
+
+        Parameters
+        ----------
+        filename: Path or str
+            The name of the parsed source file.
+        args
+            The parse arguments, any value with a deterministic repr.
+
+        Returns
+        -------
+        tuple or None
+            The pair (info, arrays) given to put, where arrays is a list of
+            read-only arrays, or None if there is no valid entry.
+        """
+        source = _source_identity(filename)
+        if source is None or not _cacheable(args):
+            return None
+        key = _entry_key(source, args)
+        metafile = self.directory / f"{key}.json"
+        try:
+            with open(metafile, "r") as fp:
+                meta = json.load(fp)
+            if meta["source"] != source or meta["args"] != repr(args):
+                raise ValueError("cache entry does not match its key")
+            arrays = []
+            for i, nbytes in enumerate(meta["arrays"]):
+                arrayfile = self.directory / f"{key}.{i}.npy"
+                if arrayfile.stat().st_size != nbytes:
+                    raise ValueError("cache entry is truncated")
+                arrays.append(_load_array(arrayfile))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            self._remove(key)
+            return None
+        # mark the entry as recently used, unless it was just evicted by
+        # another process or the cache is read-only
+        with contextlib.suppress(OSError):
+            os.utime(metafile)
+        return meta["info"], arrays
+
+    def put(self, filename, args, info, arrays):
+        """Store the parsed content of a file.
+
+        Parameters
+        ----------
+        filename: Path or str
+            The name of the parsed source file.
+        args
+            The parse arguments, any value with a deterministic repr.
+        info
+            JSON-serializable information, for example the header data.
+        arrays: list of ndarray
+            The parsed arrays.
+        """
+        source = _source_identity(filename)
+        if source is None or not _cacheable(args):
+            return
+        key = _entry_key(source, args)
+        metafile = self.directory / f"{key}.json"
+        oldsize = _entry_size(metafile)
+        sizes = []
+        for i, array in enumerate(arrays):
+            arrayfile = self.directory / f"{key}.{i}.npy"
+            _atomic_save(arrayfile, lambda fp: numpy.save(fp, array))
+            sizes.append(arrayfile.stat().st_size)
+        meta = {
+            "source": source,
+            "args": repr(args),
+            "info": info,
+            "arrays": sizes,
+        }
+        # the metadata file is written last and marks a complete entry
+        _atomic_save(metafile, lambda fp: fp.write(json.dumps(meta).encode()))
+        self._puts += 1
+        if self._nbytes is None or self._puts % _RESCAN_PUTS == 0:
+            # count the entries of other processes sharing the directory
+            self._evict()
+        else:
+            self._nbytes += sum(sizes) - (oldsize or 0)
+            if self._nbytes > self.max_bytes:
+                self._evict()
+        return
+
+    def clear(self):
+        """Remove all cache entries."""
+        for metafile in self.directory.glob("*.json"):
+            self._remove(metafile.stem)
+        self._nbytes = 0
+        return
+
+    def _remove(self, key):
+        for path in self.directory.glob(f"{key}.*"):
+            with contextlib.suppress(FileNotFoundError):
+                path.unlink()
+        return
+
+    def _evict(self):
+        """Remove least recently used entries above max_bytes.
+
+        All entries are read, so this only runs when the running total
+        exceeds max_bytes or every _RESCAN_PUTS puts.
+        """
+        entries = []
+        for metafile in self.directory.glob("*.json"):
+            nbytes = _entry_size(metafile)
+            if nbytes is None:
+                continue
+            with contextlib.suppress(OSError):
+                entries.append((metafile.stat().st_mtime, nbytes, metafile))
+        total = sum(nbytes for _, nbytes, _ in entries)
+        for _, nbytes, metafile in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(metafile.stem)
+            total -= nbytes
+        self._nbytes = total
+        return
+
+
+# puts between full scans of the cache directory
+_RESCAN_PUTS = 1000
+
+
+def _entry_size(metafile):
+    """Return the size of the arrays of a cache entry or None."""
+    try:
+        with open(metafile, "r") as fp:
+            return sum(json.load(fp)["arrays"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _source_identity(filename):
+    """Return the resolved path, size and mtime of a file or None."""
+    try:
+        path = Path(filename).resolve()
+        stat = path.stat()
+    except OSError:
+        return None
+    return [path.as_posix(), stat.st_size, stat.st_mtime_ns]
+
+
+def _cacheable(args):
+    """Return False if the parse arguments hold functions, whose repr
+    changes with their address."""
+    if isinstance(args, dict):
+        args = list(args.items())
+    if isinstance(args, (list, tuple)):
+        return all(_cacheable(arg) for arg in args)
+    # types such as dtype=float have a stable repr
+    return not callable(args) or isinstance(args, type)
+
+
+def _entry_key(source, args):
+    text = json.dumps([source, repr(args)])
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _load_array(arrayfile):
+    """Load an array file, as a read-only memory map if not empty."""
+    try:
+        return numpy.load(arrayfile, mmap_mode="r")
+    except ValueError:
+        # memory maps cannot be empty
+        array = numpy.load(arrayfile)
+    array.setflags(write=False)
+    return array
+
+
+def _atomic_save(path, write):
+    """Write a file through a temporary file and a rename."""
+    fd, tmpname = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            write(fp)
+        os.replace(tmpname, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmpname)
+        raise
+    return
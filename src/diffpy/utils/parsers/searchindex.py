@@ -0,0 +1,299 @@
+#!/usr/bin/env python
+##############################################################################
+#
+# (c) 2025 The Trustees of Columbia University in the City of New York.
+# All rights reserved.
+#
+# File coded by: Billinge Group members.
+#
+# See GitHub contributions for a more detailed list of contributors.
+# https://github.com/diffpy/diffpy.utils/graphs/contributors
+#
+# See LICENSE.rst for license information.
+#
+##############################################################################
+"""Search index of the header values of serialized databases."""
+
+import io
+import json
+import pathlib
+
+import numpy
+
+from .custom_exceptions import UnsupportedTypeError
+from .serialization import (
+    _decode_entry,
+    _iter_entries,
+    _replace_file,
+    _search_log_file,
+    _searchable,
+    supported_formats,
+)
+
+# replayed entries that are looked up by a scan before they are merged
+_MAX_DELTA = 64
+
+
+def build_search_index(serial_file):
+    """Build the search index of a database.
+
+    The header values of all entries are read from the database and saved
+    in serial_file + '.search.npz'. From then on serialize_data and
+    serialize_batch log the entries they add in serial_file + '.search',
+    which SearchIndex replays when it is opened. Building the index again
+    or calling SearchIndex.save merges them into the saved index.
+
+    Parameters
+    ----------
+    serial_file: Path or str
+        The '.json' or '.jsonl' database file.
+
+    Returns
+    -------
+    SearchIndex
+        The search index of the database.
+    """
+    sf = pathlib.Path(serial_file)
+    if sf.suffix not in supported_formats:
+        raise UnsupportedTypeError(sf.name, supported_formats)
+    logfile = _search_log_file(sf)
+    # entries added during the scan are in the log as well
+    logfile.touch()
+    log_offset = logfile.stat().st_size
+    headers = {}
+    for title, entry, _ in _iter_entries(sf, sf.suffix):
+        headers[title] = _searchable(_decode_entry(entry, None, True, None))
+    titles = numpy.array(list(headers), dtype=str)
+    _save_index(sf, titles, _index_fields(headers.values()), log_offset)
+    return SearchIndex(sf)
+
+
+class SearchIndex(object):
+    """Look-ups of entries by their header values.
+
+    Every header field with string values has an inverted index that maps
+    each value to its entries. Every field with numbers, including
+    booleans, has the values sorted for range look-ups. Both are sorted
+    arrays that are searched by bisection, so a look-up takes logarithmic
+    time and reads nothing from the database.
+
+    The index is saved next to the database by build_search_index. The
+    entries that were added afterwards are replayed from the log of the
+    database writers and merged into the sorted arrays in memory once
+    there are more than a few of them. Opening and refreshing the index
+    never write, so it can be read without write access. Call save to
+    store the merged index, so the next open replays fewer entries.
+
+    Parameters
+    ----------
+    serial_file: Path or str
+        The database file. Its search index must have been built.
+
+    Examples
+    --------
+    >>> index = SearchIndex("database.jsonl")
+    >>> index.find("sample", "Ni")
+    ['e1.gr', 'e7.gr']
+    >>> index.find_range("temperature", 300, 400)
+    ['e7.gr']
+    """
+
+    def __init__(self, serial_file):
+        self.serial_file = pathlib.Path(serial_file)
+        self._load()
+        self.refresh()
+        return
+
+    def _load(self):
+        """Read the saved index."""
+        with numpy.load(
+            _search_index_file(self.serial_file), allow_pickle=False
+        ) as npz:
+            arrays = dict(npz.items())
+        self._titles = arrays["titles"]
+        self._log_offset = int(arrays["log_offset"])
+        self._fields = {}
+        for i, key in enumerate(
+            zip(arrays["kinds"].tolist(), arrays["names"].tolist())
+        ):
+            self._fields[key] = (arrays[f"values{i}"], arrays[f"rows{i}"])
+        self._live = numpy.ones(len(self._titles), dtype=bool)
+        self._rows = None
+        # header values of the entries added after the index was saved
+        self._delta = {}
+        return
+
+    def refresh(self):
+        """Add the entries that were written since the last refresh."""
+        with open(_search_log_file(self.serial_file), "rb") as log_file:
+            log_file.seek(self._log_offset)
+            for line in log_file:
+                if not line.endswith(b"\n"):
+                    # the record is still being written
+                    break
+                self._log_offset += len(line)
+                try:
+                    title, values = json.loads(line)
+                except ValueError:
+                    continue
+                self._add(title, values)
+        if len(self._delta) > _MAX_DELTA:
+            self._merge()
+        return
+
+    def _add(self, title, values):
+        if self._rows is None:
+            self._rows = {t: i for i, t in enumerate(self._titles.tolist())}
+        # an entry written again replaces the old one
+        if title in self._rows:
+            self._live[self._rows[title]] = False
+        self._delta.pop(title, None)
+        self._delta[title] = values
+        return
+
+    def save(self):
+        """Merge the added entries and save the index."""
+        self._merge()
+        _save_index(
+            self.serial_file, self._titles, self._fields, self._log_offset
+        )
+        return
+
+    def _merge(self):
+        """Merge the added entries into the sorted arrays."""
+        live = numpy.flatnonzero(self._live)
+        newrows = numpy.full(len(self._titles), -1, dtype=numpy.int64)
+        newrows[live] = numpy.arange(len(live))
+        titles = numpy.concatenate(
+            [self._titles[live], numpy.array(list(self._delta), dtype=str)]
+        )
+        delta = _index_fields(self._delta.values())
+        fields = {}
+        for key in sorted(self._fields.keys() | delta.keys()):
+            values, rows = [], []
+            if key in self._fields:
+                base_values, base_rows = self._fields[key]
+                keep = self._live[base_rows]
+                values.append(base_values[keep])
+                rows.append(newrows[base_rows[keep]])
+            if key in delta:
+                values.append(delta[key][0])
+                rows.append(delta[key][1] + len(live))
+            values = numpy.concatenate(values)
+            rows = numpy.concatenate(rows)
+            order = numpy.argsort(values, kind="stable")
+            fields[key] = (values[order], rows[order])
+        self._titles = titles
+        self._fields = fields
+        self._live = numpy.ones(len(titles), dtype=bool)
+        self._rows = None
+        self._delta = {}
+        return
+
+    def __len__(self):
+        return int(self._live.sum()) + len(self._delta)
+
+    def find(self, field, value):
+        """Return the titles of the entries with a header value.
+
+        Parameters
+        ----------
+        field: str
+            The name of the header field.
+        value: str or float
+            The value of the field.
+
+        Returns
+        -------
+        list of str
+            The titles of the matching entries.
+        """
+        return self.find_range(field, value, value)
+
+    def find_range(self, field, low=None, high=None):
+        """Return the titles of the entries with header values in a range.
+
+        Parameters
+        ----------
+        field: str
+            The name of the header field.
+        low: str or float or None
+            The smallest value, no lower limit if None.
+        high: str or float or None
+            The largest value, no upper limit if None.
+
+        Returns
+        -------
+        list of str
+            The titles of the matching entries, the ones in the saved index
+            ordered by value.
+        """
+        kind = _kind(low if low is not None else high)
+        titles = []
+        if (kind, field) in self._fields:
+            values, rows = self._fields[kind, field]
+            start = 0 if low is None else values.searchsorted(low, "left")
+            end = len(values)
+            if high is not None:
+                end = values.searchsorted(high, "right")
+            rows = rows[start:end]
+            titles = self._titles[rows[self._live[rows]]].tolist()
+        for title, values in self._delta.items():
+            value = values.get(field)
+            if value is None or _kind(value) != kind:
+                continue
+            if (low is None or value >= low) and (
+                high is None or value <= high
+            ):
+                titles.append(title)
+        return titles
+
+
+def _kind(value):
+    """Return the index kind of a header value."""
+    return "str" if isinstance(value, str) else "number"
+
+
+def _index_fields(headers):
+    """Return the sorted values and the entry rows of each indexed field.
+
+    The fields are keyed by (kind, name), so fields that hold strings in
+    some entries and numbers in others have two indexes.
+    """
+    columns = {}
+    for row, values in enumerate(headers):
+        for name, value in values.items():
+            key = (_kind(value), name)
+            column = columns.setdefault(key, ([], []))
+            column[0].append(value)
+            column[1].append(row)
+    fields = {}
+    for key, (values, rows) in columns.items():
+        dtype = str if key[0] == "str" else numpy.float64
+        values = numpy.array(values, dtype=dtype)
+        order = numpy.argsort(values, kind="stable")
+        fields[key] = (values[order], numpy.array(rows)[order])
+    return fields
+
+
+def _save_index(serial_file, titles, fields, log_offset):
+    """Save an index in the file next to the database."""
+    arrays = {
+        "titles": titles,
+        "log_offset": numpy.array(log_offset),
+        "kinds": numpy.array([kind for kind, _ in fields], dtype=str),
+        "names": numpy.array([name for _, name in fields], dtype=str),
+    }
+    for i, (values, rows) in enumerate(fields.values()):
+        arrays[f"values{i}"] = values
+        arrays[f"rows{i}"] = rows.astype(numpy.int64)
+    buffer = io.BytesIO()
+    numpy.savez(buffer, **arrays)
+    # readers may load the index while it is saved
+    _replace_file(_search_index_file(serial_file), [buffer.getvalue()])
+    return
+
+
+def _search_index_file(serial_file):
+    """Return the saved search index of a database."""
+    return serial_file.with_name(serial_file.name + ".search.npz")
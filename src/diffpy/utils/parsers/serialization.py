@@ -13,16 +13,37 @@
 #
 ##############################################################################
 
+import contextlib
 import json
+import os
 import pathlib
+import re
+import shutil
+import uuid
 import warnings
+from collections.abc import Mapping
 
 import numpy
 
 from .custom_exceptions import ImproperSizeError, UnsupportedTypeError
+from .parsecache import _load_array
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
 
 # FIXME: add support for yaml, xml
-supported_formats = [".json"]
+supported_formats = [".json", ".jsonl"]
+
+
+class NumpyEncoder(json.JSONEncoder):
+    """JSON encoder that writes numpy arrays as lists."""
+
+    def default(self, data_obj):
+        if type(data_obj) is numpy.ndarray:
+            return data_obj.tolist()
+        return json.JSONEncoder.default(self, data_obj)
 
 
 def serialize_data(
@@ -32,6 +53,9 @@ def serialize_data(
     dt_colnames=None,
     show_path=True,
     serial_file=None,
+    binary_arrays=False,
+    lock=False,
+    compact=False,
 ):
     """Serialize file data into a dictionary. Can also save dictionary
     into a serial language file. Dictionary is formatted as {filename:
@@ -60,14 +84,419 @@ def serialize_data(
         'path' is not included in hddata, extract path from filename.
     serial_file
         Serial language file to dump dictionary into. If None (default), no
-        dumping will occur.
+        dumping will occur. A '.jsonl' file is an append-only database of
+        one entry per line, where adding an entry does not read or rewrite
+        the existing entries. See compact_database.
+    binary_arrays: bool
+        When True, keep the data columns and the data table as arrays and
+        save them as '.npy' files in the directory serial_file + '.arrays'.
+        The database then only holds references to these files, which
+        deserialize_data loads as read-only memory maps. (Default False.)
+    lock: bool
+        When True, hold an exclusive advisory lock on serial_file + '.lock'
+        while the database is updated, so several processes can write to
+        the same database without losing entries. (Default False.)
+    compact: bool
+        When True, write a '.json' database without indentation, which the
+        C encoder of the json module does fastest. Otherwise numeric arrays
+        and lists are formatted in bulk in the layout of json.dump with
+        indent=2. (Default False.)
 
     Returns
     -------
     dict:
         Returns the dictionary loaded from/into the updated database file.
+        For a '.jsonl' file only the new entry is returned.
+    """
+
+    entry = _build_entry(
+        filename, hdata, data_table, dt_colnames, show_path, binary_arrays
+    )
+    title, data = next(iter(entry.items()))
+
+    # no save
+    if serial_file is None:
+        return entry
+
+    # saving/updating file
+    # check if supported type
+    sf = pathlib.Path(serial_file)
+    sf_name = sf.name
+    extension = sf.suffix
+    if extension not in supported_formats:
+        raise UnsupportedTypeError(sf_name, supported_formats)
+
+    with _database_lock(sf, lock):
+        # arrays are saved under the lock, compaction deletes the arrays
+        # that are not referenced yet
+        stored = entry
+        if binary_arrays:
+            stored = {title: _store_arrays(data, _array_directory(sf))}
+
+        # json lines, append the entry to the database
+        if extension == ".jsonl":
+            _append_jsonl(serial_file, stored)
+            _append_search_log(sf, entry)
+            return entry
+
+        # json, new file or update
+        file_data = {}
+        if sf.is_file():
+            with open(serial_file, "r") as json_read:
+                file_data = json.load(json_read)
+        file_data.update(stored)
+        text = _dumps_json(file_data, compact)
+        _replace_file(sf, [text])
+        _append_search_log(sf, entry)
+    if binary_arrays:
+        # return arrays, not the references to their files
+        file_data = deserialize_data(serial_file)
+    return file_data
+
+
+def serialize_batch(
+    entries,
+    serial_file,
+    dt_colnames=None,
+    show_path=True,
+    binary_arrays=False,
+    lock=False,
+    compact=False,
+):
+    """Serialize many files into a database in one transaction.
+
+    All entries are added in a single write of a temporary file that then
+    replaces the database, so an interrupted batch leaves the database
+    unchanged.
+
+    Parameters
+    ----------
+    entries: iterable
+        The tuples (filename, hdata, data_table) of the files, see
+        serialize_data.
+    serial_file
+        The '.json' or '.jsonl' database file. It is created if it does not
+        exist.
+    dt_colnames, show_path, binary_arrays, compact
+        The options of serialize_data, used for all entries.
+    lock: bool
+        When True, hold the advisory lock of serialize_data during the
+        commit. Writers that collect entries in batches take the lock once
+        per batch. (Default False.)
+
+    Returns
+    -------
+    dict:
+        The dictionary of the new entries.
+    """
+    sf = pathlib.Path(serial_file)
+    if sf.suffix not in supported_formats:
+        raise UnsupportedTypeError(sf.name, supported_formats)
+    new_data = {}
+    for filename, hdata, data_table in entries:
+        new_data.update(
+            _build_entry(
+                filename,
+                hdata,
+                data_table,
+                dt_colnames,
+                show_path,
+                binary_arrays,
+            )
+        )
+    with _database_lock(sf, lock):
+        stored = new_data
+        if binary_arrays:
+            arraydir = _array_directory(sf)
+            stored = {
+                title: _store_arrays(data, arraydir)
+                for title, data in new_data.items()
+            }
+        if sf.suffix == ".jsonl":
+            _append_jsonl(sf, stored, atomic=True)
+        else:
+            file_data = {}
+            if sf.is_file():
+                with open(sf, "r") as json_file:
+                    file_data = json.load(json_file)
+            file_data.update(stored)
+            text = _dumps_json(file_data, compact)
+            _replace_file(sf, [text])
+        _append_search_log(sf, new_data)
+    return new_data
+
+
+def deserialize_data(filename, filetype=None, lazy=False):
+    """Load a dictionary from a serial file.
+
+    Parameters
+    ----------
+    filename
+        Serial file to load from.
+
+    filetype
+        For specifying extension type (i.e. '.json').
+
+    lazy: bool
+        When True, return a SerialDatabase that only loads the entries that
+        are looked up. Only supported for '.jsonl' files. (Default False.)
+
+    Returns
+    -------
+    dict
+        A dictionary read from a serial file.
     """
 
+    # check if supported type
+    f = pathlib.Path(filename)
+    f_name = f.name
+
+    if filetype is None:
+        extension = f.suffix
+        if extension not in supported_formats:
+            raise UnsupportedTypeError(f_name, supported_formats)
+    else:
+        extension = filetype
+
+    if lazy:
+        if extension != ".jsonl":
+            raise UnsupportedTypeError(f_name, [".jsonl"])
+        return SerialDatabase(filename)
+
+    return_dict = {}
+    load_arrays = _array_loader(f)
+
+    # json
+    if extension == ".json":
+        with open(filename, "r") as json_file:
+            j_dict = json.load(json_file, object_hook=load_arrays)
+            return_dict = j_dict
+
+    # json lines, later entries replace earlier ones of the same title
+    if extension == ".jsonl":
+        return_dict = _read_jsonl(filename, object_hook=load_arrays)
+
+    if len(return_dict) == 0:
+        warnings.warn(
+            "Loaded dictionary is empty. Possibly due to improper file type.",
+            RuntimeWarning,
+        )
+
+    return return_dict
+
+
+def iter_database(filename, fields=None, headers_only=False, filetype=None):
+    """Iterate the entries of a serial file without loading all of it.
+
+    The file is parsed incrementally, so the memory in use is bounded by
+    the largest entry instead of the whole database. The values that are
+    not requested are skipped without being decoded.
+
+    Parameters
+    ----------
+    filename
+        Serial file to load from.
+
+    fields: iterable of str or None
+        The keys of the entries to load, all keys if None.
+
+    headers_only: bool
+        When True, skip the values that are lists or stored arrays, which
+        includes the data columns. (Default False.)
+
+    filetype
+        For specifying extension type (i.e. '.json').
+
+    Yields
+    ------
+    title: str
+        The title of the entry.
+    entry
+        The entry with the requested fields. Entries of '.jsonl' files are
+        yielded in the order they were written, so a title that was written
+        more than once is yielded again with the later entry.
+
+    Examples
+    --------
+    >>> for title, header in iter_database("database.json", headers_only=True):
+    ...     if header["temperature"] > 300:
+    ...         print(title)
+    """
+    f = pathlib.Path(filename)
+    if filetype is None:
+        extension = f.suffix
+        if extension not in supported_formats:
+            raise UnsupportedTypeError(f.name, supported_formats)
+    else:
+        extension = filetype
+    if fields is not None:
+        fields = set(fields)
+    load_arrays = _array_loader(f)
+    for title, entry, _ in _iter_entries(filename, extension):
+        yield title, _decode_entry(entry, fields, headers_only, load_arrays)
+    return
+
+
+class SerialDatabase(Mapping):
+    """Read-only mapping of a '.jsonl' database that loads entries on
+    demand.
+
+    The keys are the entry titles. The byte offset of the latest entry of
+    every title is taken from the index file serial_file + '.index' that
+    serialize_data appends to, so looking up one entry reads and parses
+    only that entry. Entries appended without the index, for example by an
+    older version, are found by scanning the database after the last
+    indexed entry.
+
+    Parameters
+    ----------
+    serial_file
+        The '.jsonl' database file.
+
+    Examples
+    --------
+    >>> database = SerialDatabase("database.jsonl")
+    >>> data = database["e1.gr"]  # parses only this entry
+    """
+
+    def __init__(self, serial_file):
+        self.serial_file = pathlib.Path(serial_file)
+        self._load_arrays = _array_loader(self.serial_file)
+        self.refresh()
+        return
+
+    def refresh(self):
+        """Update the offsets after the database was changed."""
+        # index records are [title, offset, length], later records win
+        records = []
+        indexfile = _index_file(self.serial_file)
+        if indexfile.is_file():
+            with open(indexfile, "rb") as index_file:
+                for line in index_file:
+                    try:
+                        title, offset, length = json.loads(line)
+                    except ValueError:
+                        continue
+                    records.append((offset, length, title))
+        records.sort()
+        # trust the records as long as they cover the database without gaps
+        self._offsets = {}
+        end = 0
+        size = self.serial_file.stat().st_size
+        for offset, length, title in records:
+            if offset > end + 1 or offset + length > size:
+                break
+            self._offsets[title] = (offset, length)
+            end = offset + length
+        self._scan(end)
+        return
+
+    def _scan(self, offset):
+        """Add the entries of lines from offset to the end."""
+        with open(self.serial_file, "rb") as jsonl_file:
+            jsonl_file.seek(offset)
+            for line in jsonl_file:
+                try:
+                    titles = json.loads(line) if line.strip() else {}
+                except ValueError:
+                    titles = {}
+                for title in titles:
+                    self._offsets[title] = (offset, len(line))
+                offset += len(line)
+        return
+
+    def __getitem__(self, title):
+        offset, length = self._offsets[title]
+        entry = self._read(offset, length)
+        if entry is None or title not in entry:
+            # the database was rewritten, for example by compaction
+            self._offsets = {}
+            self._scan(0)
+            offset, length = self._offsets[title]
+            entry = self._read(offset, length)
+        return entry[title]
+
+    def _read(self, offset, length):
+        with open(self.serial_file, "rb") as jsonl_file:
+            jsonl_file.seek(offset)
+            line = jsonl_file.read(length)
+        try:
+            return json.loads(line, object_hook=self._load_arrays)
+        except ValueError:
+            return None
+
+    def __iter__(self):
+        return iter(self._offsets)
+
+    def __len__(self):
+        return len(self._offsets)
+
+
+def compact_database(serial_file, lock=False):
+    """Rewrite a database with only the latest entry of every title.
+
+    Superseded entries are dropped from an append-only '.jsonl' database,
+    its index is rebuilt and array files that are no longer referenced are
+    deleted. The database
+    is written to a temporary file that replaces the original one, so it is
+    never left half-written.
+
+    Parameters
+    ----------
+    serial_file
+        The '.json' or '.jsonl' database file.
+    lock: bool
+        When True, hold the advisory lock of serialize_data, so concurrent
+        writers do not lose entries during the compaction.
+        (Default False.)
+    """
+    sf = pathlib.Path(serial_file)
+    if sf.suffix not in supported_formats:
+        raise UnsupportedTypeError(sf.name, supported_formats)
+    with _database_lock(sf, lock):
+        _compact_database(sf)
+    return
+
+
+def _compact_database(sf):
+    """Compact the database file sf, see compact_database."""
+    if sf.suffix == ".jsonl":
+        file_data = _read_jsonl(sf)
+        lines = [
+            json.dumps({title: data}) + "\n"
+            for title, data in file_data.items()
+        ]
+        _replace_file(sf, lines)
+        # the offsets of all entries changed
+        index = []
+        offset = 0
+        for title, line in zip(file_data, lines):
+            length = len(line.encode())
+            index.append(json.dumps([title, offset, length]) + "\n")
+            offset += length
+        _replace_file(_index_file(sf), index)
+    else:
+        with open(sf, "r") as json_file:
+            file_data = json.load(json_file)
+    # only referenced arrays remain after the database was replaced
+    referenced = {
+        value["__ndarray__"]
+        for data in file_data.values()
+        for value in data.values()
+        if isinstance(value, dict) and "__ndarray__" in value
+    }
+    arraydir = _array_directory(sf)
+    if arraydir.is_dir():
+        for arrayfile in arraydir.glob("*.npy"):
+            if arrayfile.name not in referenced:
+                arrayfile.unlink()
+    return
+
+
+def _build_entry(
+    filename, hdata, data_table, dt_colnames, show_path, binary_arrays
+):
+    """Return the database entry {title: data} of a file."""
     # compile data_table and hddata together
     data = {}
 
@@ -109,7 +538,11 @@ def serialize_data(
                         ),
                         RuntimeWarning,
                     )
-                data.update({colname: list(data_table[:, idx])})
+                if binary_arrays:
+                    column = numpy.array(data_table[:, idx])
+                else:
+                    column = list(data_table[:, idx])
+                data.update({colname: column})
                 named_columns += 1
 
     # finally add data_table as an entry named 'data table' if not all
@@ -123,98 +556,456 @@ def serialize_data(
                 ),
                 RuntimeWarning,
             )
+        if binary_arrays:
+            data_table = numpy.asarray(data_table)
         data.update({"data table": data_table})
 
     # parse name using pathlib and generate dictionary entry
     entry = {title: data}
+    return entry
 
-    # no save
-    if serial_file is None:
-        return entry
 
-    # saving/updating file
-    # check if supported type
-    sf = pathlib.Path(serial_file)
-    sf_name = sf.name
-    extension = sf.suffix
-    if extension not in supported_formats:
-        raise UnsupportedTypeError(sf_name, supported_formats)
+def _append_jsonl(serial_file, entries, atomic=False):
+    """Append entries as lines to a json lines database and its index.
 
-    # new file or update
-    existing = False
+    With atomic True, all lines are written to a copy of the database that
+    replaces it, instead of being appended in place.
+    """
+    if not entries:
+        return
+    lines = [
+        (json.dumps({title: data}, cls=NumpyEncoder) + "\n").encode()
+        for title, data in entries.items()
+    ]
+    with open(serial_file, "a+b") as jsonl_file:
+        offset = jsonl_file.tell()
+        # start a new line after an incomplete last line
+        if offset > 0:
+            jsonl_file.seek(-1, os.SEEK_END)
+            if jsonl_file.read(1) != b"\n":
+                lines[0] = b"\n" + lines[0]
+                offset += 1
+        if atomic:
+            _replace_file(serial_file, lines, keep=True)
+        else:
+            jsonl_file.write(b"".join(lines))
+    lines[0] = lines[0].lstrip(b"\n")
+    records = []
+    for title, line in zip(entries, lines):
+        records.append(json.dumps([title, offset, len(line)]) + "\n")
+        offset += len(line)
+    with open(_index_file(serial_file), "a") as index_file:
+        index_file.write("".join(records))
+    return
+
+
+def _append_search_log(serial_file, entries):
+    """Append the header values of entries to the log of the search index
+    of a database, if it has one."""
+    logfile = _search_log_file(serial_file)
+    if not logfile.is_file():
+        return
+    records = "".join(
+        json.dumps([title, _searchable(data)]) + "\n"
+        for title, data in entries.items()
+    )
+    with open(logfile, "a+b") as log_file:
+        # start a new line after an incomplete last line
+        if log_file.tell() > 0:
+            log_file.seek(-1, os.SEEK_END)
+            if log_file.read(1) != b"\n":
+                records = "\n" + records
+        log_file.write(records.encode())
+    return
+
+
+def _searchable(data):
+    """Return the header values of an entry that can be indexed."""
+    return {
+        key: value
+        for key, value in data.items()
+        if isinstance(value, (str, int, float))
+    }
+
+
+def _read_jsonl(filename, object_hook=None):
+    """Read the latest view of a json lines database."""
+    file_data = {}
+    with open(filename, "rb") as jsonl_file:
+        for line in jsonl_file:
+            if not line.strip():
+                continue
+            try:
+                file_data.update(json.loads(line, object_hook=object_hook))
+            except ValueError:
+                # an append that was interrupted leaves an incomplete line
+                warnings.warn(
+                    f"Ignored an incomplete entry in {filename}.",
+                    RuntimeWarning,
+                )
+    return file_data
+
+
+def _replace_file(path, lines, keep=False):
+    """Write lines to a temporary file and rename it to path.
+
+    With keep True, the lines follow a copy of the current content.
+    """
+    tmpname = os.path.join(
+        os.path.dirname(os.path.abspath(path)), f".tmp-{uuid.uuid4().hex}"
+    )
+    # new files get the mode of open(path, "w"), that is 0o666 less umask
+    fd = os.open(tmpname, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
     try:
-        open(serial_file)
-        existing = True
-    except FileNotFoundError:
-        pass
+        with os.fdopen(fd, "wb") as tmp_file:
+            if os.path.exists(path):
+                shutil.copymode(path, tmpname)
+                if keep:
+                    with open(path, "rb") as current:
+                        shutil.copyfileobj(current, tmp_file)
+            for line in lines:
+                tmp_file.write(
+                    line if isinstance(line, bytes) else line.encode()
+                )
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        os.replace(tmpname, path)
+    except BaseException:
+        os.unlink(tmpname)
+        raise
+    return
+
+
+@contextlib.contextmanager
+def _database_lock(serial_file, lock):
+    """Hold an exclusive lock of a database if lock is True."""
+    if not lock:
+        yield
+        return
+    if fcntl is None:
+        raise OSError("Locking a database requires the fcntl module.")
+    # lock a separate file, the database is replaced on updates
+    lockfile = pathlib.Path(serial_file)
+    lockfile = lockfile.with_name(lockfile.name + ".lock")
+    with open(lockfile, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+    return
+
+
+def _dumps_json(obj, compact=False):
+    """Return the json text of a database.
+
+    The indented text is identical to json.dumps with indent=2 and the
+    NumpyEncoder, but float arrays and lists of floats are formatted in
+    bulk instead of item by item.
+    """
+    if compact:
+        return json.dumps(obj, separators=(",", ":"), cls=NumpyEncoder)
+    return _dumps_indented(obj, 0)
 
-    # json
-    if extension == ".json":
-        # cannot serialize numpy arrays
-        class NumpyEncoder(json.JSONEncoder):
-            def default(self, data_obj):
-                if type(data_obj) is numpy.ndarray:
-                    return data_obj.tolist()
-                return json.JSONEncoder.default(self, data_obj)
-
-        # dump if non-existing
-        if not existing:
-            with open(serial_file, "w") as jsonfile:
-                file_data = entry  # for return
-                json.dump(file_data, jsonfile, indent=2, cls=NumpyEncoder)
-
-        # update if existing
-        else:
-            with open(serial_file, "r") as json_read:
-                file_data = json.load(json_read)
-                file_data.update(entry)
-            with open(serial_file, "w") as json_write:
-                # dump to string first for formatting
-                json.dump(file_data, json_write, indent=2, cls=NumpyEncoder)
 
-    return file_data
+# json spelling of the non-finite floats
+_NONFINITE_FLOATS = {"nan": "NaN", "inf": "Infinity", "-inf": "-Infinity"}
 
 
-def deserialize_data(filename, filetype=None):
-    """Load a dictionary from a serial file.
+def _dumps_indented(obj, level):
+    """Return the json text of obj nested at the indentation level."""
+    indent = "\n" + "  " * level
+    if not _has_bulk_floats(obj):
+        return json.dumps(obj, indent=2, cls=NumpyEncoder).replace(
+            "\n", indent
+        )
+    if type(obj) is dict:
+        items = [
+            json.dumps(key) + ": " + _dumps_indented(value, level + 1)
+            for key, value in obj.items()
+        ]
+        return (
+            "{"
+            + indent
+            + "  "
+            + ("," + indent + "  ").join(items)
+            + (indent + "}")
+        )
+    if type(obj) is list and not all(isinstance(v, float) for v in obj):
+        return json.dumps(obj, indent=2, cls=NumpyEncoder).replace(
+            "\n", indent
+        )
+    floats = numpy.asarray(obj, dtype=float)
+    texts = list(map(float.__repr__, floats.ravel().tolist()))
+    if not numpy.isfinite(floats).all():
+        texts = [_NONFINITE_FLOATS.get(text, text) for text in texts]
+    if floats.ndim == 1:
+        return _join_floats(texts, indent)
+    ncols = floats.shape[1]
+    rows = [
+        _join_floats(texts[i : i + ncols], indent + "  ")
+        for i in range(0, len(texts), ncols)
+    ]
+    return (
+        "[" + indent + "  " + ("," + indent + "  ").join(rows) + (indent + "]")
+    )
+
+
+def _join_floats(texts, indent):
+    """Return the json list of float texts at an indentation."""
+    sep = "," + indent + "  "
+    return "[" + indent + "  " + sep.join(texts) + indent + "]"
+
+
+# the smallest float list worth formatting in bulk
+_BULK_FLOATS = 256
+
+
+def _has_bulk_floats(obj):
+    """Return True if obj is or holds in nested dictionaries a long float
+    array or a long list that starts with a float."""
+    if type(obj) is dict:
+        if not all(type(key) is str for key in obj):
+            return False
+        return any(_has_bulk_floats(value) for value in obj.values())
+    if type(obj) is numpy.ndarray:
+        return (
+            obj.dtype.kind == "f"
+            and obj.ndim in (1, 2)
+            and obj.size >= _BULK_FLOATS
+        )
+    return (
+        type(obj) is list
+        and len(obj) >= _BULK_FLOATS
+        and isinstance(obj[0], float)
+    )
 
-    Parameters
-    ----------
-    filename
-        Serial file to load from.
 
-    filetype
-        For specifying extension type (i.e. '.json').
+_CHUNK_SIZE = 2**16
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_STRUCTURE = re.compile(r'["\[\]{}]')
+_SCALAR = re.compile(r"[^,:\]}\s]*")
+# _store_arrays writes the reference key first
+_ARRAY_REFERENCE = re.compile(rb'\{\s*"__ndarray__"')
 
-    Returns
-    -------
-    dict
-        A dictionary read from a serial file.
-    """
 
-    # check if supported type
-    f = pathlib.Path(filename)
-    f_name = f.name
+class _JsonStream(object):
+    """Incremental reader of the members of a json object.
 
-    if filetype is None:
-        extension = f.suffix
-        if extension not in supported_formats:
-            raise UnsupportedTypeError(f_name, supported_formats)
-    else:
-        extension = filetype
+    The source is either bytes or a binary file that is read in chunks as
+    needed. The bytes are handled as latin-1 text, so positions in the text
+    are byte offsets in the source. Values are located by their brackets
+    and strings only, so skipping a value does not decode it.
+    """
 
-    return_dict = {}
+    def __init__(self, source):
+        if isinstance(source, bytes):
+            self.text = source.decode("latin-1")
+            self._fp = None
+        else:
+            self.text = ""
+            self._fp = source
+        self.pos = 0
+        # the offset of the text in the source
+        self._base = 0
+        return
+
+    def members(self):
+        """Yield the triples (key, value bytes, offset) of the object."""
+        self._expect("{")
+        if self._next_char() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = json.loads(self._value()[0])
+            if not isinstance(key, str):
+                raise ValueError("Expected a string key.")
+            self._expect(":")
+            yield (key,) + self._value()
+            if self._expect(",}") == "}":
+                return
+
+    def _more(self):
+        """Read more text, return False at the end of the file."""
+        if self._fp is None:
+            return False
+        # grow geometrically to parse large values in linear time
+        remaining = self.text[self.pos :]
+        chunk = self._fp.read(max(_CHUNK_SIZE, len(remaining)))
+        self._base += self.pos
+        self.text = remaining + chunk.decode("latin-1")
+        self.pos = 0
+        return bool(chunk)
+
+    def _next_char(self):
+        """Skip whitespace and return the next character, '' at the end."""
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text) or not self._more():
+                return self.text[self.pos : self.pos + 1]
+
+    def _expect(self, chars):
+        char = self._next_char()
+        if not char or char not in chars:
+            raise ValueError(
+                f"Expected one of {chars!r} at position "
+                f"{self._base + self.pos}."
+            )
+        self.pos += 1
+        return char
+
+    def _value(self):
+        """Return the bytes and the offset of the next value."""
+        self._next_char()
+        while True:
+            end = _value_end(self.text, self.pos)
+            if end is not None:
+                break
+            if not self._more():
+                raise ValueError("Unexpected end of the json data.")
+        value = self.text[self.pos : end].encode("latin-1")
+        offset = self._base + self.pos
+        self.pos = end
+        return value, offset
+
+
+def _value_end(text, pos):
+    """Return the end of the json value at pos or None if incomplete."""
+    char = text[pos : pos + 1]
+    if char == '"':
+        match = _STRING.match(text, pos)
+        return match and match.end()
+    if char not in ("[", "{"):
+        # a number or literal may continue in the text that follows
+        end = _SCALAR.match(text, pos).end()
+        if end == pos < len(text):
+            raise ValueError(f"Expected a json value at position {pos}.")
+        return end if end < len(text) else None
+    depth = 0
+    while True:
+        match = _STRUCTURE.search(text, pos)
+        if match is None:
+            return None
+        char = match.group()
+        if char == '"':
+            match = _STRING.match(text, match.start())
+            if match is None:
+                return None
+        elif char in "[{":
+            depth += 1
+        else:
+            depth -= 1
+        pos = match.end()
+        if depth == 0:
+            return pos
 
-    # json
-    if extension == ".json":
-        with open(filename, "r") as json_file:
-            j_dict = json.load(json_file)
-            return_dict = j_dict
 
-    if len(return_dict) == 0:
-        warnings.warn(
-            "Loaded dictionary is empty. Possibly due to improper file type.",
-            RuntimeWarning,
-        )
+def _iter_entries(filename, extension):
+    """Yield the triples (title, entry bytes, offset) of a database.
 
-    return return_dict
+    The offset is the position of the entry in the file, so the entry can
+    be read again without parsing the rest of the file.
+    """
+    if extension == ".jsonl":
+        offset = 0
+        with open(filename, "rb") as jsonl_file:
+            for line in jsonl_file:
+                start = offset
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    members = list(_JsonStream(line).members())
+                except ValueError:
+                    warnings.warn(
+                        f"Ignored an incomplete entry in {filename}.",
+                        RuntimeWarning,
+                    )
+                    continue
+                for title, entry, position in members:
+                    yield title, entry, start + position
+    else:
+        with open(filename, "rb") as json_file:
+            yield from _JsonStream(json_file).members()
+    return
+
+
+def _decode_entry(entry, fields, headers_only, object_hook):
+    """Decode a database entry, keeping only the requested fields."""
+    if (fields is None and not headers_only) or not entry.startswith(b"{"):
+        return json.loads(entry, object_hook=object_hook)
+    decoded = {}
+    if len(entry) < _CHUNK_SIZE:
+        # small entries are decoded faster as a whole, array references
+        # are only found in the values of an entry
+        for key, value in json.loads(entry).items():
+            if fields is not None and key not in fields:
+                continue
+            is_array = isinstance(value, dict) and "__ndarray__" in value
+            if headers_only and (isinstance(value, list) or is_array):
+                continue
+            if is_array and object_hook is not None:
+                value = object_hook(value)
+            decoded[key] = value
+        return decoded
+    for key, value, _ in _JsonStream(entry).members():
+        if fields is not None and key not in fields:
+            continue
+        if headers_only and (
+            value.startswith(b"[") or _ARRAY_REFERENCE.match(value)
+        ):
+            continue
+        decoded[key] = json.loads(value, object_hook=object_hook)
+    return decoded
+
+
+def _index_file(serial_file):
+    """Return the index file of a json lines database."""
+    serial_file = pathlib.Path(serial_file)
+    return serial_file.with_name(serial_file.name + ".index")
+
+
+def _search_log_file(serial_file):
+    """Return the log of the entries added to the search index of a
+    database."""
+    serial_file = pathlib.Path(serial_file)
+    return serial_file.with_name(serial_file.name + ".search")
+
+
+def _array_loader(serial_file):
+    """Return a json object_hook that loads the arrays referenced in a
+    database."""
+    arraydir = _array_directory(serial_file)
+
+    def load_arrays(obj):
+        if "__ndarray__" in obj:
+            return _load_array(arraydir / obj["__ndarray__"])
+        return obj
+
+    return load_arrays
+
+
+def _array_directory(serial_file):
+    """Return the directory of the array files of a database."""
+    serial_file = pathlib.Path(serial_file)
+    return serial_file.with_name(serial_file.name + ".arrays")
+
+
+def _store_arrays(data, arraydir):
+    """Save the arrays in data to files in arraydir and return a copy of
+    data that references them."""
+    stored = {}
+    for key, value in data.items():
+        if isinstance(value, numpy.ndarray):
+            arraydir.mkdir(exist_ok=True)
+            # unique names, existing files may be mapped by readers
+            name = uuid.uuid4().hex + ".npy"
+            numpy.save(arraydir / name, value)
+            value = {
+                "__ndarray__": name,
+                "dtype": value.dtype.str,
+                "shape": list(value.shape),
+            }
+        stored[key] = value
+    return stored
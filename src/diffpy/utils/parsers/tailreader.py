@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+##############################################################################
+#
+# (c) 2025 The Trustees of Columbia University in the City of New York.
+# All rights reserved.
+#
+# File coded by: Billinge Group members.
+#
+# See GitHub contributions for a more detailed list of contributors.
+# https://github.com/diffpy/diffpy.utils/graphs/contributors
+#
+# See LICENSE.rst for license information.
+#
+##############################################################################
+"""Incremental reading of text data files that grow while they are read."""
+
+import warnings
+from pathlib import Path
+
+import numpy
+
+from diffpy.utils.parsers.loaddata import _find_data_block, _read_data_block
+
+
+class TailReader(object):
+    """Follow the data block of a text file that is being appended to.
+
+    The data block is found as in load_data. Every poll then reads the file
+    from the end of the last complete line seen before, so it costs time in
+    proportion to the appended rows only. A line is only parsed once it
+    ends with a newline, so rows that are still being written are picked
+    up by a later poll.
+
+    Parameters
+    ----------
+    filename: Path or str
+        The name of the file to follow.
+    minrows: int
+        Minimum number of rows of the data block. The block is not used
+        before the file holds this many rows. (Default 10.)
+    kwargs:
+        Keyword arguments that are passed to numpy.loadtxt, see load_data.
+
+    Attributes
+    ----------
+    filename: Path
+        The name of the followed file.
+    offset: int
+        The byte offset in the file up to which the lines were read.
+
+    Examples
+    --------
+    >>> reader = TailReader("scan.dat")
+    >>> while acquiring():
+    ...     rows = reader.poll()
+    ...     update_plot(reader.data)
+    """
+
+    def __init__(self, filename, minrows=10, **kwargs):
+        self.filename = Path(filename)
+        self.minrows = minrows
+        self.kwargs = dict(kwargs)
+        self.kwargs.setdefault("ndmin", 2)
+        self.reset()
+        return
+
+    def reset(self):
+        """Forget the data read so far, the next poll starts over."""
+        self.offset = 0
+        self._start = None
+        self._ncvblock = None
+        self._buffer = numpy.empty((0, 0))
+        self._nrows = 0
+        return
+
+    @property
+    def data(self):
+        """ndarray: All rows of the data block read so far.
+
+        The rows are always two-dimensional as in load_data_chunks.
+        """
+        return self._buffer[: self._nrows]
+
+    def poll(self):
+        """Read the rows appended to the file since the last poll.
+
+        If the file got shorter than the offset, it was truncated or
+        replaced and it is read again from the start.
+
+        Returns
+        -------
+        rows: ndarray
+            The new rows of the data block, empty if there are none.
+        """
+        if self.filename.stat().st_size < self.offset:
+            self.reset()
+        with open(self.filename, "rb") as fid:
+            fid.seek(self.offset)
+            content = fid.read()
+        # the last line may not be complete yet
+        content = content[: content.rfind(b"\n") + 1]
+        if self._start is None:
+            return self._findblock(content)
+        rows = self._parse(content)
+        self.offset += len(content)
+        self._append(rows)
+        return rows
+
+    def _findblock(self, content):
+        """Look for the data block in the content of the whole file."""
+        lines = content.splitlines(keepends=True)
+        _, start, ncvblock, _ = _find_data_block(
+            lines, self.minrows, False, None, None, self.kwargs
+        )
+        if start is None:
+            return self._buffer[:0]
+        # the scan ends after minrows rows or at the end of the content
+        rows = self._parse(content[start:], start, ncvblock)
+        if len(rows) < self.minrows:
+            return self._buffer[:0]
+        self._start = start
+        self._ncvblock = ncvblock
+        self.offset = len(content)
+        self._append(rows)
+        return rows
+
+    def _parse(self, content, start=None, ncvblock=None):
+        """Parse data rows from complete lines of content."""
+        if start is None:
+            start = self._start
+            ncvblock = self._ncvblock
+        lines = content.splitlines(keepends=True)
+        with warnings.catch_warnings():
+            # appended blank or comment lines hold no data
+            warnings.simplefilter("ignore", UserWarning)
+            return _read_data_block(lines, start, ncvblock, self.kwargs)
+
+    def _append(self, rows):
+        """Append rows to the buffer, growing it geometrically."""
+        nrows = self._nrows + len(rows)
+        if not self._nrows:
+            self._buffer = rows.copy()
+        elif nrows > len(self._buffer):
+            capacity = max(nrows, 2 * len(self._buffer))
+            buffer = numpy.empty((capacity,) + rows.shape[1:], rows.dtype)
+            buffer[: self._nrows] = self._buffer[: self._nrows]
+            self._buffer = buffer
+        self._buffer[self._nrows : nrows] = rows
+        self._nrows = nrows
+        return
@@ -14,12 +14,25 @@
 ##############################################################################
 """Various utilities related to data parsing and manipulation."""
 
+import collections
+import os
+import threading
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
+from scipy.interpolate import CubicSpline
 
+# total bytes of the grids and operators kept by nsplan
+NSPLAN_CACHE_BYTES = 256 * 2**20
+# relative spread of xp steps below which xp is treated as uniform, loose
+# enough for grids that were printed with six significant digits
+UNIFORM_GRID_RTOL = 1e-3
+# number of output points evaluated together by the resampling kernels
+RESAMPLE_BLOCK_SIZE = 256
 
-def wsinterp(x, xp, fp, left=None, right=None):
+
+def wsinterp(x, xp, fp, left=None, right=None, workers=None):
     """One-dimensional Whittaker-Shannon interpolation.
 
     Reconstruct a continuous signal from discrete data points by utilizing
@@ -28,6 +41,13 @@ def wsinterp(x, xp, fp, left=None, right=None):
     (array or float). The implementation is based on E. T. Whittaker's 1915
     paper (https://doi.org/10.1017/S0370164600017806).
 
+    The sinc kernel requires uniformly spaced xp. When the steps of xp vary
+    by more than UNIFORM_GRID_RTOL, for example on jittered or rebinned
+    grids, the values are interpolated with a cubic spline instead. Smaller
+    variations, such as the rounding of a grid read from a text file, are
+    tolerated and the sinc kernel uses the mean step of xp. The spline
+    accepts xp in any order but raises ValueError for repeated xp values.
+
     Parameters
     ----------
     x: ``ndarray``
@@ -43,6 +63,12 @@ def wsinterp(x, xp, fp, left=None, right=None):
         If given, set fp for x > xp[-1] to right. Otherwise, if right is None
         (default) or not given, set fp for x > xp[-1] to fp evaluated at
         xp[-1].
+    workers: int
+        Number of threads used to evaluate the interpolation. The x values
+        are split into blocks of RESAMPLE_BLOCK_SIZE points that are shared
+        among the threads. If -1, use all available CPUs. If None (default),
+        evaluate all blocks in the calling thread. The result does not depend
+        on the number of workers.
 
     Returns
     -------
@@ -54,15 +80,30 @@ def wsinterp(x, xp, fp, left=None, right=None):
     if scalar:
         x = np.array(x)
         x.resize(1)
-    # shape = (nxp, nx), nxp copies of x data span axis 1
-    u = np.resize(x, (len(xp), len(x)))
-    # Must take transpose of u for proper broadcasting with xp.
-    # shape = (nx, nxp), v(xp) data spans axis 1
-    v = (xp - u.T) / (xp[1] - xp[0])
-    # shape = (nx, nxp), m(v) data spans axis 1
-    m = fp * np.sinc(v)
-    # Sum over m(v) (axis 1)
-    fp_at_x = np.sum(m, axis=1)
+    xp = np.asarray(xp, dtype=float)
+    fp = np.asarray(fp, dtype=float)
+    if is_uniform_grid(xp):
+
+        def evaluate(start, stop):
+            xb = x[start:stop]
+            # shape = (nxp, nx), nxp copies of x data span axis 1
+            u = np.resize(xb, (len(xp), len(xb)))
+            # Must take transpose of u for proper broadcasting with xp.
+            # shape = (nx, nxp), v(xp) data spans axis 1
+            v = (xp - u.T) / _mean_step(xp)
+            # shape = (nx, nxp), m(v) data spans axis 1
+            m = fp * np.sinc(v)
+            # Sum over m(v) (axis 1)
+            return np.sum(m, axis=1)
+
+    else:
+        xp, fp = _sorted_grid(xp, fp)
+        spline = CubicSpline(xp, fp)
+
+        def evaluate(start, stop):
+            return spline(x[start:stop])
+
+    fp_at_x = _evaluate_blocks(evaluate, len(x), workers)
 
     # Enforce left and right
     if left is None:
@@ -79,7 +120,7 @@ def wsinterp(x, xp, fp, left=None, right=None):
     return fp_at_x
 
 
-def nsinterp(xp, fp, qmin=0, qmax=25, left=None, right=None):
+def nsinterp(xp, fp, qmin=0, qmax=25, left=None, right=None, workers=None):
     """One-dimensional Whittaker-Shannon interpolation onto the Nyquist-
     Shannon grid.
 
@@ -87,7 +128,8 @@ def nsinterp(xp, fp, qmin=0, qmax=25, left=None, right=None):
     the NS grid. Uses the minimum number of points N required by the Nyquist
     sampling theorem. N = (qmax-qmin)(rmax-rmin)/pi, where rmin and rmax are
     the ends of the real-space ranges. fp must be finite, and the user inputs
-    qmin and qmax of the frequency-domain.
+    qmin and qmax of the frequency-domain. The grid and the interpolation
+    operator are cached for each (xp, qmin, qmax) combination, see nsplan.
 
     Parameters
     ----------
@@ -99,6 +141,9 @@ def nsinterp(xp, fp, qmin=0, qmax=25, left=None, right=None):
         The lower band limit in the frequency domain.
     qmax: float
         The upper band limit in the frequency domain.
+    workers: int
+        Number of threads used to apply the interpolation operator, see
+        wsinterp. The result does not depend on the number of workers.
 
     Returns
     -------
@@ -108,17 +153,178 @@ def nsinterp(xp, fp, qmin=0, qmax=25, left=None, right=None):
         The interpolated values at points x. Returns a single float if x is a
         scalar, otherwise returns a numpy.ndarray.
     """
-    # Ensure numpy array
-    xp = np.array(xp)
+    x, operator = nsplan(xp, qmin, qmax)
+    if operator is None:
+        return x.copy(), wsinterp(x, xp, fp, workers=workers)
+    fp = np.asarray(fp, dtype=float)
+
+    def evaluate(start, stop):
+        return operator[start:stop] @ fp
+
+    fp_at_x = _evaluate_blocks(evaluate, len(x), workers)
+
+    return x.copy(), fp_at_x
+
+
+def nsplan(xp, qmin=0, qmax=25):
+    """Compute the Nyquist-Shannon grid and interpolation operator for
+    xp.
+
+    The grid and the operator depend only on xp, qmin and qmax, so they are
+    cached for the most recent combinations, up to NSPLAN_CACHE_BYTES in
+    total. clear_nsplan_cache releases them. Resampling any fp defined on xp
+    then costs a single matrix-vector product, ``operator @ fp``. A
+    non-uniform xp is interpolated with a cubic spline instead, which is
+    built from fp itself, so only its grid is cached.
+
+    Parameters
+    ----------
+    xp: ``ndarray``
+        The array of known x values.
+    qmin: float
+        The lower band limit in the frequency domain.
+    qmax: float
+        The upper band limit in the frequency domain.
+
+    Returns
+    -------
+    x: ``ndarray``
+        The Nyquist-Shannon grid computed for the given qmin and qmax.
+    operator: ``ndarray`` or None
+        The matrix of shape (len(x), len(xp)) that performs the
+        Whittaker-Shannon interpolation from xp onto x, None if xp is not
+        uniform. Both arrays are shared by the cache and are read-only.
+    """
+    global _nsplan_bytes
+    xp = np.ascontiguousarray(xp, dtype=float)
+    key = (xp.tobytes(), float(qmin), float(qmax))
+    with _nsplan_lock:
+        if key in _nsplan_cache:
+            _nsplan_cache.move_to_end(key)
+            return _nsplan_cache[key]
+    plan = _nsplan(xp, *key[1:])
+    with _nsplan_lock:
+        if key not in _nsplan_cache:
+            _nsplan_cache[key] = plan
+            _nsplan_bytes += _plan_bytes(key, plan)
+        # plans larger than the whole cache are not kept
+        while _nsplan_bytes > NSPLAN_CACHE_BYTES:
+            old_key, old_plan = _nsplan_cache.popitem(last=False)
+            _nsplan_bytes -= _plan_bytes(old_key, old_plan)
+    return plan
+
+
+def clear_nsplan_cache():
+    """Release the grids and operators cached by nsplan."""
+    global _nsplan_bytes
+    with _nsplan_lock:
+        _nsplan_cache.clear()
+        _nsplan_bytes = 0
+    return
+
+
+# plans of nsplan by (xp bytes, qmin, qmax), least recently used first
+_nsplan_cache = collections.OrderedDict()
+_nsplan_bytes = 0
+_nsplan_lock = threading.Lock()
+
+
+def _plan_bytes(key, plan):
+    """Return the memory held by a cached plan of nsplan."""
+    x, operator = plan
+    return (
+        len(key[0]) + x.nbytes + (0 if operator is None else operator.nbytes)
+    )
+
+
+def _nsplan(xp, qmin, qmax):
     rmin = np.min(xp)
     rmax = np.max(xp)
 
     nspoints = int(np.round((qmax - qmin) * (rmax - rmin) / np.pi))
 
     x = np.linspace(rmin, rmax, nspoints)
-    fp_at_x = wsinterp(x, xp, fp)
+    x.setflags(write=False)
+    if not is_uniform_grid(xp):
+        return x, None
+    operator = _wsoperator(x, xp)
+    operator.setflags(write=False)
+    return x, operator
+
+
+def is_uniform_grid(xp):
+    """Check if the points in xp are equally spaced.
+
+    Parameters
+    ----------
+    xp: ``ndarray``
+        The array of known x values.
 
-    return x, fp_at_x
+    Returns
+    -------
+    bool
+        True if all steps of xp agree with their mean within
+        UNIFORM_GRID_RTOL.
+    """
+    xp = np.asarray(xp, dtype=float)
+    if len(xp) < 3:
+        return True
+    dx = np.diff(xp)
+    step = _mean_step(xp)
+    return bool(np.all(np.abs(dx - step) <= UNIFORM_GRID_RTOL * abs(step)))
+
+
+def _mean_step(xp):
+    """Return the mean step of xp, which rounding affects less than any
+    single step."""
+    return (xp[-1] - xp[0]) / (len(xp) - 1)
+
+
+def _sorted_grid(xp, fp):
+    """Return xp and fp in increasing order of xp for the cubic spline."""
+    order = np.argsort(xp, kind="stable")
+    xp = xp[order]
+    if np.any(np.diff(xp) == 0):
+        raise ValueError(
+            "xp has repeated values, which cannot be interpolated on a "
+            "non-uniform grid."
+        )
+    return xp, fp[order]
+
+
+def _evaluate_blocks(evaluate, npoints, workers=None):
+    """Evaluate output points in fixed-size blocks, possibly in threads.
+
+    The blocks do not depend on the number of workers, so every output
+    point is always computed by the same operations.
+    """
+    bounds = [
+        (start, min(start + RESAMPLE_BLOCK_SIZE, npoints))
+        for start in range(0, npoints, RESAMPLE_BLOCK_SIZE)
+    ]
+    if workers == -1:
+        workers = os.cpu_count()
+    if workers is None or workers <= 1 or len(bounds) <= 1:
+        blocks = [evaluate(start, stop) for start, stop in bounds]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            blocks = list(executor.map(lambda b: evaluate(*b), bounds))
+    if not blocks:
+        return np.empty(0, dtype=float)
+    return np.concatenate(blocks)
+
+
+def _wsoperator(x, xp):
+    """Return the matrix that maps fp on a uniform xp onto wsinterp(x, xp,
+    fp)."""
+    # shape = (nx, nxp), v(xp) data spans axis 1
+    v = (xp - x[:, np.newaxis]) / _mean_step(xp)
+    operator = np.sinc(v)
+    # Enforce the default left and right values fp[0] and fp[-1]
+    for outside, idx in ((x < xp[0], 0), (x > xp[-1], -1)):
+        operator[outside] = 0.0
+        operator[outside, idx] = 1.0
+    return operator
 
 
 def resample(r, s, dr):
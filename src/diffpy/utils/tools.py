@@ -1,5 +1,7 @@
 import importlib.metadata
 import json
+import multiprocessing
+import os
 from copy import copy
 from pathlib import Path
 
@@ -335,9 +337,14 @@ def _objective_function(params, z, observed_data):
     return np.sum(residuals**2)
 
 
-def _compute_single_mud(z_data, I_data):
+def _compute_single_mud(z_data, I_data, seed=None):
     """Perform dual annealing optimization and extract the
-    parameters."""
+    parameters.
+
+    The seed of the random number generator of the optimization is any
+    value accepted by numpy.random.default_rng. If None, the global numpy
+    random state is used.
+    """
     bounds = [
         (
             1e-5,
@@ -355,7 +362,12 @@ def _compute_single_mud(z_data, I_data):
         (1e-5, 20),  # muD: [small positive value, upper bound]
         (-100000, 100000),  # slope: [lower bound, upper bound]
     ]
-    result = dual_annealing(_objective_function, bounds, args=(z_data, I_data))
+    result = dual_annealing(
+        _objective_function,
+        bounds,
+        args=(z_data, I_data),
+        seed=None if seed is None else np.random.default_rng(seed),
+    )
     diameter, half_slit_width, z0, I0, mud, slope = result.x
     convolved_fitted_signal = _extend_z_and_convolve(
         z_data, diameter, half_slit_width, z0, I0, mud, slope
@@ -365,7 +377,9 @@ def _compute_single_mud(z_data, I_data):
     return mud, rmse
 
 
-def compute_mud(filepath):
+def compute_mud(
+    filepath, restarts=20, workers=None, seed=None, agree=None, rtol=1e-3
+):
     """Compute the best-fit mu*D value from a z-scan file, removing the
     sample holder effect.
 
@@ -384,15 +398,69 @@ def compute_mud(filepath):
     ----------
     filepath : str
         The path to the z-scan file.
+    restarts : int
+        The number of fits from random starting points. (Default 20.)
+    workers : int
+        The number of processes that run the fits. Use -1 for all CPUs.
+        If None (default), the fits run one after the other.
+    seed : int or None
+        The seed of the fits. Every fit gets its own random number
+        generator spawned from it, so the result is reproducible and does
+        not depend on the number of workers. If None (default), the fits
+        draw from the global numpy random state, as seeded by
+        numpy.random.seed, or with workers from fresh entropy.
+    agree : int or None
+        Stop early once this many fits agree with the best fit so far
+        within rtol. The fits are taken in order. The fits that have not
+        finished are skipped, with workers the processes running them are
+        terminated. If None (default), all fits are run.
+    rtol : float
+        The relative tolerance of the mu*D values of agreeing fits.
+        (Default 1e-3.)
 
     Returns
     -------
     mu*D : float
         The best-fit mu*D value.
     """
+    if restarts < 1:
+        raise ValueError("At least one restart is needed.")
     z_data, I_data = load_data(filepath, unpack=True)
-    best_mud, _ = min(
-        (_compute_single_mud(z_data, I_data) for _ in range(20)),
-        key=lambda pair: pair[1],
-    )
+    seeds = np.random.SeedSequence(seed).spawn(restarts)
+    if workers == -1:
+        workers = os.cpu_count()
+    if workers is None or workers <= 1:
+        if seed is None:
+            seeds = [None] * restarts
+        fits = (_compute_single_mud(z_data, I_data, s) for s in seeds)
+        return _best_mud(fits, agree, rtol)
+    # leaving the pool terminates the workers, so fits that are still
+    # running when the fits agree do not delay the result
+    with multiprocessing.Pool(workers) as pool:
+        results = [
+            pool.apply_async(_compute_single_mud, (z_data, I_data, s))
+            for s in seeds
+        ]
+        # in submission order, so early stopping does not depend on the
+        # order in which the fits finish
+        return _best_mud((r.get() for r in results), agree, rtol)
+
+
+def _best_mud(fits, agree=None, rtol=1e-3):
+    """Return the mu*D of the fit with the lowest rmse.
+
+    The fits are the pairs (mu*D, rmse). With agree, stop at the first fit
+    after which that many fits have a mu*D within rtol of the best one.
+    """
+    results = []
+    for fit in fits:
+        results.append(fit)
+        best_mud, _ = min(results, key=lambda pair: pair[1])
+        if agree is not None:
+            agreeing = sum(
+                abs(mud - best_mud) <= rtol * abs(best_mud)
+                for mud, _ in results
+            )
+            if agreeing >= agree:
+                break
     return best_mud
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+
+"""Unit tests for diffpy.utils.parsers.columnar."""
+
+import json
+import shutil
+
+import numpy as np
+import pytest
+
+from diffpy.utils.parsers import load_data
+from diffpy.utils.parsers.columnar import ColumnarDatabase, export_columnar
+from diffpy.utils.parsers.custom_exceptions import UnsupportedTypeError
+from diffpy.utils.parsers.serialization import (
+    deserialize_data,
+    serialize_batch,
+)
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl"])
+@pytest.mark.parametrize("binary_arrays", [False, True])
+def test_export_columnar(tmp_path, datafile, suffix, binary_arrays):
+    """Check the columns and entries of an exported database."""
+    serial_file = tmp_path / ("database" + suffix)
+    entries = [
+        (
+            headerfile,
+            load_data(headerfile, headers=True),
+            load_data(headerfile),
+        )
+        for headerfile in sorted(datafile("dbload").glob("*.gr"))
+    ]
+    serialize_batch(
+        entries,
+        serial_file,
+        dt_colnames=["r", "gr"],
+        show_path=False,
+        binary_arrays=binary_arrays,
+    )
+    expected = deserialize_data(serial_file)
+    columns = export_columnar(serial_file)
+    assert (tmp_path / f"database{suffix}.columns.npz").is_file()
+    assert columns.titles.tolist() == list(expected)
+    assert sorted(columns.fields) == ["qmax", "qmin", "rmax", "rmin"]
+    qmax = columns.column("qmax")
+    assert qmax.dtype == np.float64
+    assert qmax.tolist() == [entry["qmax"] for entry in expected.values()]
+    for title in columns.titles:
+        entry = columns.load(title)
+        assert entry.keys() == expected[title].keys()
+        for key, value in entry.items():
+            assert np.array_equal(value, expected[title][key])
+
+
+def test_ColumnarDatabase_query(tmp_path):
+    """Check typed columns and queries of mixed header values."""
+    serial_file = tmp_path / "database.jsonl"
+    headers = [
+        {"sample": "Ni", "temperature": 300, "cooled": False},
+        {"sample": "Pt", "temperature": 350.5, "cooled": True},
+        {"sample": "Ni", "temperature": 400, "shape": {"a": 1}},
+        {"sample": "Cu", "temperature": None, "cooled": True},
+        {"sample": 3, "r": [1.0, 2.0]},
+    ]
+    lines = [json.dumps({f"e{i}.gr": h}) for i, h in enumerate(headers)]
+    # a later entry replaces the first one
+    lines.append(json.dumps({"e0.gr": {"sample": "Ni", "temperature": 310}}))
+    serial_file.write_text("\n".join(lines) + "\n")
+    columnar_file = tmp_path / "columns.npz"
+    export_columnar(serial_file, columnar_file)
+    columns = ColumnarDatabase(columnar_file)
+
+    assert len(columns) == 5
+    assert columns.fields == ["sample", "temperature", "cooled", "shape"]
+    assert columns.column("sample").tolist() == ["Ni", "Pt", "Ni", "Cu", "3"]
+    temperature = columns.column("temperature")
+    assert temperature.dtype == np.float64
+    assert temperature.tolist() == [310.0, 350.5, 400.0, None, None]
+    assert columns.column("cooled").dtype == bool
+    assert columns.column("shape").tolist()[2] == '{"a": 1}'
+
+    assert columns.query(("temperature", ">", 320)).tolist() == [
+        "e1.gr",
+        "e2.gr",
+    ]
+    assert columns.query(
+        ("sample", "in", ["Ni", "Cu"]), ("temperature", "<=", 400)
+    ).tolist() == ["e0.gr", "e2.gr"]
+    assert columns.query(("cooled", "!=", True)).tolist() == []
+    assert columns.query(("pressure", "==", 1)).tolist() == []
+    assert columns.query().tolist() == columns.titles.tolist()
+    with pytest.raises(ValueError, match="Unknown operator"):
+        columns.mask("sample", "~", "Ni")
+    assert columns.load("e0.gr") == {"sample": "Ni", "temperature": 310}
+
+    # the database is given when it was moved
+    moved = tmp_path / "moved.jsonl"
+    shutil.copy2(serial_file, moved)
+    serial_file.unlink()
+    columns = ColumnarDatabase(columnar_file, serial_file=moved)
+    assert columns.load("e4.gr") == headers[4]
+    with open(moved, "a") as fp:
+        fp.write(json.dumps({"e5.gr": {}}) + "\n")
+    with pytest.raises(ValueError, match="export it again"):
+        columns.load("e4.gr")
+    with pytest.raises(UnsupportedTypeError):
+        export_columnar(tmp_path / "database.txt")
+
+
+def test_ColumnarDatabase_mixed_types(tmp_path):
+    """Check fields with strings and numbers are compared by kind."""
+    serial_file = tmp_path / "database.jsonl"
+    headers = [
+        {"temperature": 300, "cooled": True},
+        {"temperature": "RT", "cooled": False},
+        {"temperature": 0, "cooled": "n/a"},
+        {"temperature": 350.5},
+    ]
+    lines = [json.dumps({f"e{i}.gr": h}) for i, h in enumerate(headers)]
+    serial_file.write_text("\n".join(lines) + "\n")
+    columns = export_columnar(serial_file)
+
+    assert columns.column("temperature").tolist() == [
+        "300",
+        "RT",
+        "0",
+        "350.5",
+    ]
+    assert columns.query(("temperature", ">", 299)).tolist() == [
+        "e0.gr",
+        "e3.gr",
+    ]
+    assert columns.query(("temperature", "<", 1)).tolist() == ["e2.gr"]
+    assert columns.query(("temperature", "==", "RT")).tolist() == ["e1.gr"]
+    assert columns.query(("temperature", "in", ["RT", 0])).tolist() == [
+        "e1.gr",
+        "e2.gr",
+    ]
+    # values of a kind the field never has match no entries
+    assert columns.query(("cooled", "==", True)).tolist() == ["e0.gr"]
+    assert columns.query(("cooled", "==", "n/a")).tolist() == ["e2.gr"]
+    assert not columns.mask("cooled", ">", 1).any()
+    assert not columns.mask("temperature", "==", None).any()
@@ -2,11 +2,24 @@
 
 """Unit tests for diffpy.utils.parsers.loaddata."""
 
+import asyncio
+import bz2
+import gzip
+import lzma
+import re
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import pytest
 
-from diffpy.utils.parsers import load_data
-from diffpy.utils.parsers.loaddata import loadData
+from diffpy.utils.parsers import (
+    load_data,
+    load_data_async,
+    load_data_chunks,
+    load_data_files,
+    load_data_files_async,
+)
+from diffpy.utils.parsers.loaddata import TextDataLoader, _tofloats, loadData
 
 
 def test_loadData_default(datafile):
@@ -155,3 +168,325 @@ def test_load_data_headers(datafile):
         loaddatawithheaders, headers=True, hdel=delimiter, hignore=hignore
     )
     assert hdata == expected
+
+
+def test_TextDataLoader(datafile):
+    """Check TextDataLoader finds every data block and its header."""
+    loadmultiple = datafile("loadmultiple.txt")
+    d1 = np.array([[1, 10], [2, 20], [3, 30], [4, 40]])
+    d2 = np.array([[1, 11, 0.1], [2, 21, 0.2], [3, 31, np.nan]])
+
+    tdl = TextDataLoader(minrows=3)
+    tdl.read(loadmultiple)
+    assert tdl.filename == str(loadmultiple)
+    assert tdl.headers == [
+        "# scan 1\ntemperature = 300\nx y\n",
+        "# scan 2\ntemperature = 310\nx y z\n",
+        "trailing text\n",
+    ]
+    # the blank line does not split the first data block
+    assert np.array_equal(tdl.datasets[0], d1)
+    assert np.array_equal(tdl.datasets[1], d2, equal_nan=True)
+    assert tdl.datasets[2].size == 0
+
+    # text and binary file objects give the same result
+    with open(loadmultiple) as fp:
+        tdl.readfp(fp)
+    assert len(tdl.datasets) == 3
+    assert np.array_equal(tdl.datasets[1], d2, equal_nan=True)
+
+    # usecols selects columns, negative indices count from the end
+    tdl = TextDataLoader(minrows=3, usecols=[0, -1])
+    tdl.read(loadmultiple)
+    assert np.array_equal(tdl.datasets[0], d1)
+    assert np.array_equal(tdl.datasets[1], d2[:, [0, 2]], equal_nan=True)
+
+    # the default minrows=10 finds no data block
+    tdl = TextDataLoader()
+    tdl.read(loadmultiple)
+    assert len(tdl.headers) == 1 and tdl.datasets[0].size == 0
+
+
+def test_load_data_undecodable_header(tmp_path):
+    """Check the data block is found below header bytes that are not
+    valid text."""
+    datafile = tmp_path / "binaryheader.dat"
+    data = np.column_stack([np.arange(20.0), np.arange(20.0) ** 2])
+    with open(datafile, "wb") as fp:
+        fp.write(b"\xff\xfe instrument dump\n")
+        np.savetxt(fp, data)
+    assert np.array_equal(load_data(datafile), data)
+    assert np.array_equal(load_data(datafile, usecols=(1,)), data[:, 1])
+    hdata, data = load_data(datafile, headers=True, with_data=True)
+    assert hdata == {} and data.shape == (20, 2)
+    # TextDataLoader keeps the header with the bytes replaced
+    datafile.write_bytes(b"\xff bad\n1 2\n3 4\n")
+    tdl = TextDataLoader(minrows=2)
+    tdl.read(datafile)
+    assert tdl.headers == ["\ufffd bad\n"]
+    assert np.array_equal(tdl.datasets[0], [[1, 2], [3, 4]])
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{}, {"usecols": (1,)}, {"skiprows": 2}, {"minrows": 3, "max_rows": 4}],
+)
+def test_load_data_plain_file(tmp_path, kwargs):
+    """Check a plain file, which loadtxt reads by its path, loads as the
+    same content read line by line from a compressed file."""
+    plainfile = tmp_path / "blocks.dat"
+    with open(plainfile, "wb") as fp:
+        fp.write(b"\xff header\r\n# r g\n1 2\n3 4\n\nrow 5\n")
+        np.savetxt(fp, np.arange(40.0).reshape(20, 2))
+        fp.write(b"# trailing comment\n")
+    gzfile = tmp_path / "blocks.dat.gz"
+    gzfile.write_bytes(gzip.compress(plainfile.read_bytes()))
+    expected = load_data(gzfile, **kwargs)
+    assert expected.size
+    assert np.array_equal(load_data(plainfile, **kwargs), expected)
+
+
+def test_load_data_empty(tmp_path):
+    """Check an empty file has an empty data block."""
+    emptyfile = tmp_path / "empty.txt"
+    emptyfile.touch()
+    assert load_data(emptyfile).size == 0
+
+
+def test_load_data_chunks(datafile, tmp_path):
+    """Check load_data_chunks splits the data block of load_data."""
+    loaddatawithheaders = datafile("loaddatawithheaders.txt")
+    expected = load_data(loaddatawithheaders)
+
+    chunks = list(load_data_chunks(loaddatawithheaders, chunksize=3000))
+    assert [len(chunk) for chunk in chunks] == [3000, 3000, 3000, 1001]
+    assert np.array_equal(np.concatenate(chunks), expected)
+
+    # chunks stay two-dimensional for a single column
+    chunks = list(load_data_chunks(loaddatawithheaders, usecols=(1,)))
+    assert chunks[0].shape == (len(expected), 1)
+    assert np.array_equal(chunks[0][:, 0], expected[:, 1])
+
+    # no data block, no chunks
+    emptyfile = tmp_path / "empty.txt"
+    emptyfile.write_text("no data here\n")
+    assert list(load_data_chunks(emptyfile)) == []
+
+
+@pytest.mark.parametrize("chunksize", [1, 10, 2**20])
+def test_TextDataLoader_iterread(datafile, chunksize):
+    """Check iterread yields the blocks found by read."""
+    loadmultiple = datafile("loadmultiple.txt")
+    tdl = TextDataLoader(minrows=3)
+    tdl.read(loadmultiple)
+    expected = list(zip(tdl.headers, tdl.datasets))
+
+    actual = list(tdl.iterread(loadmultiple, chunksize=chunksize))
+    assert len(actual) == len(expected)
+    for (header, dataset), (eheader, edataset) in zip(actual, expected):
+        assert header == eheader
+        assert np.array_equal(dataset, edataset, equal_nan=True)
+    # blocks are not accumulated while streaming
+    assert tdl.headers == [] and tdl.datasets == []
+
+
+def test_TextDataLoader_separators(tmp_path):
+    """Check numeric-looking separators do not spoil the other words."""
+    data = np.arange(60.0).reshape(30, 2)
+    lines = [f"{x:g} {y:g}" for x, y in data]
+    text = "----------\n" + "\n".join(lines[:15]) + "\n- . e 1-2\n"
+    text += "\n".join(lines[15:]) + "\n"
+    filename = tmp_path / "separated.txt"
+    filename.write_text(text)
+    tdl = TextDataLoader(minrows=10)
+    tdl.read(filename)
+    assert tdl.headers == ["----------\n", "- . e 1-2\n"]
+    assert np.array_equal(tdl.datasets[0], data[:15])
+    assert np.array_equal(tdl.datasets[1], data[15:])
+
+    content = b"1 ---- 2.5e1 1.2.3 -3 + 4e nan"
+    words = [(m.start(), m.end()) for m in re.finditer(rb"\S+", content)]
+    wbeg, wend = np.array(words).T
+    values, ok = _tofloats(content, wbeg, wend)
+    expected = [1, np.nan, 25, np.nan, -3, np.nan, np.nan, np.nan]
+    assert np.array_equal(values, expected, equal_nan=True)
+    assert ok.tolist() == [1, 0, 1, 0, 1, 0, 0, 1]
+
+
+@pytest.mark.parametrize("usecols", [(1,), (0, -1), (3, -3)])
+def test_TextDataLoader_usecols(tmp_path, usecols):
+    """Check only the used columns need to hold numbers."""
+    data = np.arange(40.0).reshape(10, 4)
+    lines = [" ".join(f"{v:g}" for v in row) for row in data]
+    # words outside of the used columns do not break the block
+    lines[5] = lines[5].replace("22", "n/a")
+    filename = tmp_path / "wide.txt"
+    filename.write_text("header\n" + "\n".join(lines) + "\n")
+    tdl = TextDataLoader(minrows=10, usecols=usecols)
+    tdl.read(filename)
+    assert tdl.headers == ["header\n"]
+    assert np.array_equal(tdl.datasets[0], data[:, list(usecols)])
+
+
+@pytest.mark.parametrize("chunksize", [1, 2**20])
+def test_TextDataLoader_skiprows(datafile, chunksize):
+    """Check skipped lines are never data."""
+    loadmultiple = datafile("loadmultiple.txt")
+    tdl = TextDataLoader(minrows=2)
+    tdl.read(loadmultiple)
+    tdlskip = TextDataLoader(minrows=2, skiprows=4)
+    tdlskip.read(loadmultiple)
+    # the first block begins on line 3, so its first row is skipped
+    assert tdlskip.headers[0] == tdl.headers[0] + "1 10\n"
+    assert np.array_equal(tdlskip.datasets[0], tdl.datasets[0][1:])
+    headers = tdlskip.headers
+    blocks = list(tdlskip.iterread(loadmultiple, chunksize=chunksize))
+    assert [header for header, _ in blocks] == headers
+
+
+@pytest.mark.parametrize(
+    "use_processes, ordered", [(False, True), (False, False), (True, True)]
+)
+def test_load_data_files(datafile, tmp_path, use_processes, ordered):
+    """Check load_data_files loads every file and collects errors."""
+    dbload = datafile("dbload")
+    grfiles = sorted(dbload.glob("*.gr"))
+    missing = tmp_path / "missing.gr"
+
+    results, errors = load_data_files(
+        grfiles + [missing],
+        max_workers=2,
+        use_processes=use_processes,
+        ordered=ordered,
+        chunksize=1,
+    )
+    if ordered:
+        assert list(results) == grfiles
+    assert sorted(results) == grfiles
+    for grfile in grfiles:
+        assert np.array_equal(results[grfile], load_data(grfile))
+    assert list(errors) == [missing]
+    assert isinstance(errors[missing], IOError)
+
+    # a glob pattern and load_data keyword arguments
+    results, errors = load_data_files(str(dbload / "*.gr"), headers=True)
+    assert list(results) == [str(grfile) for grfile in grfiles]
+    assert results[str(grfiles[0])] == load_data(grfiles[0], headers=True)
+    assert errors == {}
+
+
+def test_load_data_with_data(datafile):
+    """Check headers and data can be read in one call."""
+    loaddatawithheaders = datafile("loaddatawithheaders.txt")
+    options = {"hdel": ": ", "hignore": ["# ", "// ", "["]}
+    hdata, data = load_data(
+        loaddatawithheaders,
+        headers=True,
+        with_data=True,
+        **options,
+    )
+    assert hdata == load_data(loaddatawithheaders, headers=True, **options)
+    assert np.array_equal(data, load_data(loaddatawithheaders))
+
+    # with_data alone does not change the default return value
+    data = load_data(loaddatawithheaders, with_data=True)
+    assert isinstance(data, np.ndarray)
+
+
+@pytest.mark.parametrize(
+    "suffix, compress",
+    [(".gz", gzip.compress), (".bz2", bz2.compress), (".xz", lzma.compress)],
+)
+def test_load_data_compressed(datafile, tmp_path, suffix, compress):
+    """Check compressed files are decompressed transparently."""
+    source = datafile("loaddatawithheaders.txt")
+    filename = tmp_path / ("data.txt" + suffix)
+    filename.write_bytes(compress(source.read_bytes()))
+    options = {"hdel": ": ", "hignore": ["# ", "// ", "["]}
+    expected = load_data(source, headers=True, with_data=True, **options)
+    hdata, data = load_data(filename, headers=True, with_data=True, **options)
+    assert hdata == expected[0]
+    assert np.array_equal(data, expected[1])
+    chunks = list(load_data_chunks(filename, chunksize=7))
+    assert np.array_equal(np.concatenate(chunks), expected[1])
+
+    multiple = tmp_path / ("loadmultiple.txt" + suffix)
+    multiple.write_bytes(compress(datafile("loadmultiple.txt").read_bytes()))
+    tdl = TextDataLoader(minrows=2)
+    tdl.read(datafile("loadmultiple.txt"))
+    tdlz = TextDataLoader(minrows=2)
+    tdlz.read(multiple)
+    assert tdlz.headers == tdl.headers
+    for data, expected in zip(tdlz.datasets, tdl.datasets):
+        assert np.array_equal(data, expected, equal_nan=True)
+    blocks = list(TextDataLoader(minrows=2).iterread(multiple, chunksize=16))
+    assert [header for header, _ in blocks] == tdl.headers
+
+
+def test_load_data_header_values(tmp_path):
+    """Check header lines are parsed as by splitting on the delimiter."""
+    filename = tmp_path / "headers.txt"
+    filename.write_text(
+        "# ignored = 1\n"
+        "count = 1_000\n"
+        "limit = -Infinity\n"
+        "missing = nan\n"
+        "sample = Ni 1.5\n"
+        "twice = a = b\n"
+        "blank = \n"
+        "[defaults]\n"
+        "version = 3.1.4\n"
+        "1 2\n"
+    )
+    hdata = load_data(filename, minrows=1, headers=True, hignore=["# ", "["])
+    assert np.isnan(hdata.pop("missing"))
+    assert hdata == {
+        "count": 1000.0,
+        "limit": -np.inf,
+        "sample": "Ni 1.5",
+        "version": "3.1.4",
+    }
+
+
+def test_load_data_async(datafile):
+    """Check the async loaders return the results of load_data."""
+    loaddatawithheaders = datafile("loaddatawithheaders.txt")
+    options = {"headers": True, "with_data": True, "hdel": ": "}
+    hdata, data = asyncio.run(load_data_async(loaddatawithheaders, **options))
+    expected = load_data(loaddatawithheaders, **options)
+    assert hdata == expected[0]
+    assert np.array_equal(data, expected[1])
+
+    # parse in a pool of processes
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        data = asyncio.run(
+            load_data_async(loaddatawithheaders, executor=executor)
+        )
+    assert np.array_equal(data, expected[1])
+
+    tdl = TextDataLoader(minrows=2)
+    tdl.read(datafile("loadmultiple.txt"))
+    tdlasync = TextDataLoader(minrows=2)
+    asyncio.run(tdlasync.read_async(datafile("loadmultiple.txt")))
+    assert tdlasync.filename == str(datafile("loadmultiple.txt"))
+    assert tdlasync.headers == tdl.headers
+    for data, expected in zip(tdlasync.datasets, tdl.datasets):
+        assert np.array_equal(data, expected, equal_nan=True)
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 8])
+def test_load_data_files_async(datafile, max_concurrency):
+    """Check bulk async loading collects results and errors in order."""
+    dbload = datafile("dbload")
+    files = sorted(dbload.glob("*.gr"))
+    missing = dbload / "missing.gr"
+    results, errors = asyncio.run(
+        load_data_files_async(
+            files + [missing], max_concurrency=max_concurrency
+        )
+    )
+    assert list(results) == files
+    for filename in files:
+        assert np.array_equal(results[filename], load_data(filename))
+    assert list(errors) == [missing]
+    assert isinstance(errors[missing], IOError)
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+
+"""Unit tests for diffpy.utils.parsers.parsecache."""
+
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from diffpy.utils.parsers import ParseCache, load_data
+from diffpy.utils.parsers.loaddata import TextDataLoader
+from diffpy.utils.parsers.parsecache import _entry_key, _source_identity
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"headers": True, "hdel": ": ", "hignore": ["# ", "// ", "["]},
+        {"headers": True, "with_data": True, "hdel": ": "},
+        {"usecols": (1,)},
+    ],
+)
+def test_load_data_cache(datafile, tmp_path, kwargs):
+    """Check cached loads return the same result as parsing."""
+    filename = tmp_path / "data.txt"
+    shutil.copy(datafile("loaddatawithheaders.txt"), filename)
+    cache = ParseCache(tmp_path / "cache")
+    expected = load_data(filename, **kwargs)
+    first = load_data(filename, cache=cache, **kwargs)
+    second = load_data(filename, cache=cache, **kwargs)
+    for result in (first, second):
+        if kwargs.get("with_data"):
+            assert result[0] == expected[0]
+            assert np.array_equal(result[1], expected[1])
+        elif kwargs.get("headers"):
+            assert result == expected
+        else:
+            assert np.array_equal(result, expected)
+    if not kwargs.get("headers"):
+        assert isinstance(second, np.memmap)
+        assert not second.flags.writeable
+
+
+def test_load_data_cache_invalidation(tmp_path):
+    """Check modified files and changed arguments miss the cache."""
+    filename = tmp_path / "data.txt"
+    filename.write_text("1 2\n3 4\n")
+    cache = ParseCache(tmp_path / "cache")
+    assert np.array_equal(
+        load_data(filename, minrows=1, cache=cache), [[1, 2], [3, 4]]
+    )
+    filename.write_text("5 6 7\n8 9 10\n")
+    assert np.array_equal(
+        load_data(filename, minrows=1, cache=cache), [[5, 6, 7], [8, 9, 10]]
+    )
+    assert np.array_equal(
+        load_data(filename, minrows=1, cache=cache, usecols=[2]), [7, 10]
+    )
+
+    # corrupted entries are dropped and parsed again
+    for npyfile in (tmp_path / "cache").glob("*.npy"):
+        npyfile.write_bytes(b"garbage")
+    assert np.array_equal(
+        load_data(filename, minrows=1, cache=cache), [[5, 6, 7], [8, 9, 10]]
+    )
+
+
+def test_ParseCache_eviction(tmp_path):
+    """Check the least recently used entries are evicted first."""
+    cache = ParseCache(tmp_path / "cache", max_bytes=2500)
+    sources = []
+    for i in range(3):
+        source = tmp_path / f"source{i}.txt"
+        source.write_text(str(i))
+        cache.put(source, "args", {"i": i}, [np.full(100, i, dtype=float)])
+        # entries need distinct access times for a stable order
+        key = _entry_key(_source_identity(source), "args")
+        os.utime(tmp_path / "cache" / f"{key}.json", (i, i))
+        sources.append(source)
+    # three entries of about 900 bytes exceed the limit, so adding the
+    # third entry removed the first
+    assert cache.get(sources[0], "args") is None
+    info, (array,) = cache.get(sources[1], "args")
+    assert info == {"i": 1}
+    assert np.array_equal(array, np.full(100, 1.0))
+    # reading sources[1] made sources[2] the least recently used entry
+    source = tmp_path / "source3.txt"
+    source.write_text("3")
+    cache.put(source, "args", None, [np.zeros(100)])
+    assert cache.get(sources[2], "args") is None
+    assert cache.get(sources[1], "args") is not None
+    cache.clear()
+    assert list((tmp_path / "cache").iterdir()) == []
+
+
+def test_TextDataLoader_cache(datafile, tmp_path):
+    """Check TextDataLoader reads are served from the cache."""
+    filename = datafile("loadmultiple.txt")
+    cache = ParseCache(tmp_path / "cache")
+    tdl = TextDataLoader(minrows=2)
+    tdl.read(filename)
+    for _ in range(2):
+        cached = TextDataLoader(minrows=2, cache=cache)
+        cached.read(filename)
+        assert cached.filename == str(filename)
+        assert cached.headers == tdl.headers
+        assert len(cached.datasets) == len(tdl.datasets)
+        for data, expected in zip(cached.datasets, tdl.datasets):
+            assert np.array_equal(data, expected, equal_nan=True)
+
+
+def test_ParseCache_put_scans(tmp_path, monkeypatch):
+    """Check puts below the size limit do not read all entries."""
+    source = tmp_path / "source.txt"
+    source.write_text("0")
+    cache = ParseCache(tmp_path / "cache", max_bytes=2400)
+    scans = []
+    evict = ParseCache._evict
+    monkeypatch.setattr(
+        ParseCache, "_evict", lambda self: scans.append(1) or evict(self)
+    )
+    # entries of 208 bytes, the first put counts the existing ones
+    for i in range(11):
+        cache.put(source, i, None, [np.zeros(10)])
+    assert len(scans) == 1
+    # the running total exceeds the limit
+    cache.put(source, 11, None, [np.zeros(10)])
+    assert len(scans) == 2
+    assert len(list((tmp_path / "cache").glob("*.json"))) == 11
+
+
+def test_ParseCache_unkeyed(tmp_path, monkeypatch):
+    """Check callable arguments are not cached and a lost entry is not an
+    error."""
+    filename = tmp_path / "data.txt"
+    filename.write_text("1 2\n3 4\n")
+    cache = ParseCache(tmp_path / "cache")
+    converters = {0: lambda s: 2 * float(s)}
+    for _ in range(2):
+        data = load_data(
+            filename, minrows=1, cache=cache, converters=converters
+        )
+        assert np.array_equal(data, [[2, 2], [6, 4]])
+    assert list(cache.directory.iterdir()) == []
+    assert not isinstance(
+        load_data(filename, minrows=1, cache=cache, dtype=float), np.memmap
+    )
+    assert isinstance(
+        load_data(filename, minrows=1, cache=cache, dtype=float), np.memmap
+    )
+
+    # another process evicts the entry as it is read
+    def evicted(path, *args):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(os, "utime", evicted)
+    assert np.array_equal(
+        load_data(filename, minrows=1, cache=cache, dtype=float),
+        [[1, 2], [3, 4]],
+    )
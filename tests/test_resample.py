@@ -3,7 +3,15 @@ import random
 import numpy as np
 import pytest
 
-from diffpy.utils.resampler import nsinterp, wsinterp
+from diffpy.utils import resampler
+from diffpy.utils.resampler import (
+    RESAMPLE_BLOCK_SIZE,
+    clear_nsplan_cache,
+    is_uniform_grid,
+    nsinterp,
+    nsplan,
+    wsinterp,
+)
 
 
 def test_wsinterp():
@@ -51,3 +59,137 @@ def test_nsinterp():
 
     assert np.allclose(x, ns_x)
     assert np.allclose(ws_f, ns_f)
+
+
+def test_nsplan_cache():
+    xp = np.linspace(0, 3 * np.pi, 100)
+    fp = np.cos(2 * xp)
+    qmin, qmax = 0.5, 0.5 + 4 / 3
+
+    x, operator = nsplan(xp, qmin, qmax)
+    assert operator.shape == (len(x), len(xp))
+    # A repeated plan for the same grid comes straight from the cache
+    x2, operator2 = nsplan(xp.copy(), qmin, qmax)
+    assert x2 is x and operator2 is operator
+    assert not x.flags.writeable and not operator.flags.writeable
+
+    ns_x, ns_f = nsinterp(xp, fp, qmin, qmax)
+    assert np.allclose(ns_x, x)
+    assert np.allclose(ns_f, wsinterp(x, xp, fp))
+    # nsinterp returns a grid the caller is free to modify
+    ns_x[0] = -1
+    assert x[0] == 0
+
+
+def test_nsplan_cache_bytes(monkeypatch):
+    xp = np.linspace(0, 3 * np.pi, 100)
+
+    def cached():
+        return [qmax for _, _, qmax in resampler._nsplan_cache]
+
+    clear_nsplan_cache()
+    x4, operator4 = nsplan(xp, 0, 4)
+    nsplan(xp, 0, 3)
+    limit = resampler._nsplan_bytes
+    assert limit == (xp.nbytes + x4.nbytes + operator4.nbytes) + (
+        xp.nbytes + 9 * 8 + 9 * 100 * 8
+    )
+    # the least recently used plans are released beyond the size in bytes
+    monkeypatch.setattr(resampler, "NSPLAN_CACHE_BYTES", limit)
+    assert nsplan(xp, 0, 4)[1] is operator4
+    nsplan(xp, 0, 2)
+    assert cached() == [4, 2]
+    nsplan(xp, 0, 3)
+    assert cached() == [2, 3]
+    assert resampler._nsplan_bytes <= limit
+    # plans larger than the cache are computed but not kept
+    assert nsplan(xp, 0, 8)[1].shape == (24, 100)
+    assert cached() == []
+    assert resampler._nsplan_bytes == 0
+
+    nsplan(xp, 0, 4)
+    clear_nsplan_cache()
+    assert cached() == []
+    assert nsplan(xp, 0, 4)[1] is not operator4
+
+
+@pytest.mark.parametrize(
+    "xp, expected",
+    [
+        (np.linspace(0, 3 * np.pi, 100), True),
+        (np.arange(10.0)[::-1], True),
+        (np.array([0.0, 1.0]), True),
+        (np.array([0.0, 1.0, 2.5, 3.0]), False),
+    ],
+)
+def test_is_uniform_grid(xp, expected):
+    assert is_uniform_grid(xp) is expected
+
+
+def test_wsinterp_nonuniform():
+    # Jittered grid that covers several periods of a smooth function
+    rng = np.random.default_rng(1234)
+    xp = np.linspace(0, 2 * np.pi, 200)
+    xp[1:-1] += rng.uniform(-0.01, 0.01, len(xp) - 2)
+    fp = np.sin(xp)
+    x = np.linspace(-0.5, 2 * np.pi + 0.5, 57)
+
+    fp_at_x = wsinterp(x, xp, fp)
+    inside = (x >= xp[0]) & (x <= xp[-1])
+    assert np.allclose(fp_at_x[inside], np.sin(x[inside]), atol=1e-6)
+    assert np.all(fp_at_x[x < xp[0]] == fp[0])
+    assert np.all(fp_at_x[x > xp[-1]] == fp[-1])
+    assert wsinterp(x[10], xp, fp) == pytest.approx(fp_at_x[10])
+    # The original points are reproduced exactly
+    assert np.allclose(wsinterp(xp, xp, fp), fp)
+
+    # nsinterp resamples non-uniform data through the same spline
+    ns_x, ns_f = nsinterp(xp, fp, 0, 8)
+    assert np.allclose(ns_f, wsinterp(ns_x, xp, fp))
+    # without caching a dense operator
+    assert nsplan(xp, 0, 8)[1] is None
+
+    # The spline takes the points in any order, but not repeated ones
+    assert np.allclose(
+        wsinterp(x[inside], xp[::-1], fp[::-1]), fp_at_x[inside]
+    )
+    with pytest.raises(ValueError, match="repeated values"):
+        wsinterp(x, np.append(xp, xp[5]), np.append(fp, fp[5]))
+
+
+def test_wsinterp_text_grid(tmp_path):
+    # A Nyquist-Shannon grid saved with six significant digits and read back
+    # keeps the sinc interpolation despite the rounding of its steps
+    xp = np.linspace(0, 30, 500)
+    fp = np.sinc(xp - 10) + np.sinc(xp - 20)
+    x, fx = nsinterp(xp, fp, 0, 25)
+    np.savetxt(tmp_path / "ns.gr", np.column_stack([x, fx]), fmt="%.6g")
+    x_txt, fx_txt = np.loadtxt(tmp_path / "ns.gr", unpack=True)
+    assert not np.array_equal(np.diff(x_txt), np.diff(x))
+    assert is_uniform_grid(x_txt)
+
+    r = np.linspace(0.5, 29.5, 77)
+    fr = wsinterp(r, x_txt, fx_txt)
+    assert np.allclose(fr, wsinterp(r, x, fx), atol=1e-3)
+
+
+@pytest.mark.parametrize("workers", [None, 1, 3, -1])
+def test_resample_workers(workers):
+    xp = np.linspace(0, 10, 300)
+    fp = np.sin(xp) * np.exp(-0.1 * xp)
+    # enough points for several blocks and a partial last one
+    x = np.linspace(-1, 11, 1000)
+    jittered = xp.copy()
+    jittered[1:-1] += 0.001 * np.cos(7 * xp[1:-1])
+
+    expected = wsinterp(x, xp, fp)
+    assert np.array_equal(wsinterp(x, xp, fp, workers=workers), expected)
+    expected = wsinterp(x, jittered, fp)
+    actual = wsinterp(x, jittered, fp, workers=workers)
+    assert np.array_equal(actual, expected)
+
+    ns_x, ns_f = nsinterp(xp, fp, 0, 300)
+    assert len(ns_x) > RESAMPLE_BLOCK_SIZE
+    actual_x, actual_f = nsinterp(xp, fp, 0, 300, workers=workers)
+    assert np.array_equal(actual_x, ns_x)
+    assert np.array_equal(actual_f, ns_f)
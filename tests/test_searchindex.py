@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+
+"""Unit tests for diffpy.utils.parsers.searchindex."""
+
+import numpy as np
+import pytest
+
+from diffpy.utils.parsers import load_data, searchindex
+from diffpy.utils.parsers.searchindex import SearchIndex, build_search_index
+from diffpy.utils.parsers.serialization import (
+    deserialize_data,
+    serialize_batch,
+    serialize_data,
+)
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl"])
+def test_build_search_index(tmp_path, datafile, suffix):
+    """Check look-ups agree with a scan of the database."""
+    serial_file = tmp_path / ("database" + suffix)
+    entries = [
+        (
+            headerfile,
+            load_data(headerfile, headers=True),
+            load_data(headerfile),
+        )
+        for headerfile in sorted(datafile("dbload").glob("*.gr"))
+    ]
+    serialize_batch(entries, serial_file, dt_colnames=["r", "gr"])
+    # databases without an index have no search log
+    assert not (tmp_path / f"database{suffix}.search").exists()
+    expected = deserialize_data(serial_file)
+    index = build_search_index(serial_file)
+    assert len(index) == len(expected)
+    for title, entry in expected.items():
+        assert title in index.find("path", entry["path"])
+        assert title in index.find("qmax", entry["qmax"])
+    qmax = sorted(entry["qmax"] for entry in expected.values())
+    low, high = qmax[1], qmax[-2]
+    assert sorted(index.find_range("qmax", low, high)) == sorted(
+        title
+        for title, entry in expected.items()
+        if low <= entry["qmax"] <= high
+    )
+    assert index.find_range("qmax", high=qmax[0]) == [
+        title for title, entry in expected.items() if entry["qmax"] == qmax[0]
+    ]
+    assert index.find("qmax", "25") == []
+    assert index.find("temperature", 300) == []
+
+
+def test_SearchIndex_append(tmp_path):
+    """Check the index follows entries written after it was built."""
+    serial_file = tmp_path / "database.jsonl"
+    data_table = np.zeros((2, 2))
+
+    def write(name, **hdata):
+        serialize_data(
+            name, hdata, data_table, serial_file=serial_file, show_path=False
+        )
+
+    write("e1.gr", sample="Ni", temperature=300)
+    write("e2.gr", sample="Pt", temperature=350.5, cooled=True)
+    index = build_search_index(serial_file)
+    write("e3.gr", sample="Ni", temperature=400)
+    # a rewritten entry replaces the indexed one
+    write("e1.gr", sample="Cu", temperature=310)
+    # the index is updated when it is refreshed
+    assert index.find("sample", "Ni") == ["e1.gr"]
+    index.refresh()
+    assert index.find("sample", "Ni") == ["e3.gr"]
+    assert sorted(index.find("sample", "Cu")) == ["e1.gr"]
+    assert index.find_range("temperature", 305, 360) == ["e2.gr", "e1.gr"]
+    assert index.find("cooled", True) == ["e2.gr"]
+    assert index.find_range("sample", "Cu", "Nz") == ["e3.gr", "e1.gr"]
+
+    # merging keeps the look-ups and persists them
+    index.save()
+    for index in (index, SearchIndex(serial_file)):
+        assert len(index) == 3
+        assert index.find("sample", "Ni") == ["e3.gr"]
+        assert index.find_range("temperature", 305) == [
+            "e1.gr",
+            "e2.gr",
+            "e3.gr",
+        ]
+
+    write("e4.gr", sample="Ni")
+    write("e5.gr", sample="Ni")
+    with open(tmp_path / "database.jsonl.search", "ab") as log_file:
+        log_file.write(b'["e6.gr", {"sample": "N')
+    index = SearchIndex(serial_file)
+    assert index.find("sample", "Ni") == ["e3.gr", "e4.gr", "e5.gr"]
+    # a writer appends after the incomplete record
+    write("e7.gr", sample="Ni")
+    index.refresh()
+    assert index.find("sample", "Ni") == ["e3.gr", "e4.gr", "e5.gr", "e7.gr"]
+
+    with pytest.raises(FileNotFoundError):
+        SearchIndex(tmp_path / "other.jsonl")
+
+
+def test_SearchIndex_read_only(tmp_path, monkeypatch):
+    """Check opening and refreshing an index do not write it."""
+    serial_file = tmp_path / "database.jsonl"
+    data_table = np.zeros((2, 2))
+    serialize_data(
+        "e0.gr", {"n": 0}, data_table, serial_file=serial_file, show_path=False
+    )
+    build_search_index(serial_file)
+    entries = [(f"e{i}.gr", {"n": i}, data_table) for i in range(1, 2000)]
+    serialize_batch(entries, serial_file, show_path=False)
+    npz = tmp_path / "database.jsonl.search.npz"
+    mtime = npz.stat().st_mtime_ns
+
+    def denied(*args):
+        raise PermissionError("read-only index")
+
+    # many added entries are merged in memory only
+    monkeypatch.setattr(searchindex, "_save_index", denied)
+    index = SearchIndex(serial_file)
+    assert len(index._delta) == 0
+    serialize_batch([("e2000.gr", {"n": 2000}, data_table)], serial_file)
+    serialize_batch([("e5.gr", {"n": -5}, data_table)], serial_file)
+    index.refresh()
+    assert len(index) == 2001
+    assert index.find("n", 5) == []
+    assert index.find("n", -5) == ["e5.gr"]
+    assert index.find_range("n", 1998) == ["e1998.gr", "e1999.gr", "e2000.gr"]
+    assert npz.stat().st_mtime_ns == mtime
+    with pytest.raises(PermissionError):
+        index.save()
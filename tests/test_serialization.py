@@ -1,14 +1,25 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import numpy
 import pytest
 
-from diffpy.utils.parsers import load_data
+from diffpy.utils.parsers import load_data, serialization
 from diffpy.utils.parsers.custom_exceptions import (
     ImproperSizeError,
     UnsupportedTypeError,
 )
-from diffpy.utils.parsers.serialization import deserialize_data, serialize_data
+from diffpy.utils.parsers.serialization import (
+    NumpyEncoder,
+    SerialDatabase,
+    compact_database,
+    deserialize_data,
+    iter_database,
+    serialize_batch,
+    serialize_data,
+)
 
 
 def test_load_multiple(tmp_path, datafile):
@@ -143,3 +154,373 @@ def test_exceptions(datafile):
     assert len(record) == 4
     for msg in record:
         assert "overwritten" in msg.message.args[0]
+
+
+def test_jsonl_database(tmp_path, datafile):
+    """Check the append-only database gives the view of a json file."""
+    targetjson = datafile("targetjson.json")
+    generatedjsonl = tmp_path / "generated_serialization.jsonl"
+    tlm_list = sorted(datafile("dbload").glob("*.gr"))
+    for headerfile in tlm_list + tlm_list[:1]:
+        hdata = load_data(headerfile, headers=True)
+        data_table = load_data(headerfile)
+        entry = serialize_data(
+            headerfile,
+            hdata,
+            data_table,
+            dt_colnames=["r", "gr"],
+            show_path=False,
+            serial_file=generatedjsonl,
+        )
+        # appending returns only the new entry
+        assert list(entry) == [headerfile.name]
+    target_data = deserialize_data(targetjson)
+    assert deserialize_data(generatedjsonl) == target_data
+    assert list(deserialize_data(generatedjsonl)) == list(target_data)
+    nlines = len(tlm_list) + 1
+    assert len(generatedjsonl.read_text().splitlines()) == nlines
+
+    # compaction keeps the latest entry of every title
+    compact_database(generatedjsonl)
+    assert len(generatedjsonl.read_text().splitlines()) == len(tlm_list)
+    assert deserialize_data(generatedjsonl) == target_data
+
+    # an interrupted append is skipped
+    with open(generatedjsonl, "a") as jsonl_file:
+        jsonl_file.write('{"e9.gr": {"r": [1.0, ')
+    with pytest.warns(RuntimeWarning, match="incomplete"):
+        assert deserialize_data(generatedjsonl) == target_data
+    serialize_data(
+        tlm_list[0], {}, numpy.zeros((2, 2)), serial_file=generatedjsonl
+    )
+    with pytest.warns(RuntimeWarning, match="incomplete"):
+        file_data = deserialize_data(generatedjsonl)
+    assert numpy.array_equal(
+        file_data[tlm_list[0].name]["data table"], numpy.zeros((2, 2))
+    )
+
+    with pytest.raises(UnsupportedTypeError):
+        compact_database(datafile("wrong.type"))
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl"])
+def test_binary_arrays(tmp_path, datafile, suffix):
+    """Check arrays are stored as npy files and loaded as memory maps."""
+    serial_file = tmp_path / ("database" + suffix)
+    arraydir = tmp_path / ("database" + suffix + ".arrays")
+    tlm_list = sorted(datafile("dbload").glob("*.gr"))
+    for headerfile in tlm_list:
+        hdata = load_data(headerfile, headers=True)
+        data_table = load_data(headerfile)
+        entry = serialize_data(
+            headerfile,
+            hdata,
+            data_table,
+            dt_colnames=["r", None],
+            show_path=False,
+            serial_file=serial_file,
+            binary_arrays=True,
+        )
+        assert isinstance(entry[headerfile.name]["r"], numpy.ndarray)
+    # the database only references the array files
+    assert "__ndarray__" in serial_file.read_text()
+    assert len(list(arraydir.glob("*.npy"))) == 2 * len(tlm_list)
+
+    target_data = deserialize_data(datafile("targetjson.json"))
+    file_data = deserialize_data(serial_file)
+    assert list(file_data) == list(target_data)
+    for title, data in file_data.items():
+        target = target_data[title]
+        assert isinstance(data["r"], numpy.memmap)
+        assert not data["r"].flags.writeable
+        assert numpy.array_equal(data["r"], target["r"])
+        assert numpy.array_equal(data["data table"][:, 1], target["gr"])
+        assert data["qmax"] == target["qmax"]
+
+    # replaced entries leave arrays that compaction deletes
+    serialize_data(
+        tlm_list[0],
+        {},
+        numpy.ones((3, 2)),
+        serial_file=serial_file,
+        binary_arrays=True,
+    )
+    compact_database(serial_file)
+    assert len(list(arraydir.glob("*.npy"))) == 2 * len(tlm_list) - 1
+    file_data = deserialize_data(serial_file)
+    assert numpy.array_equal(
+        file_data[tlm_list[0].name]["data table"], numpy.ones((3, 2))
+    )
+
+
+def test_SerialDatabase(tmp_path, datafile):
+    """Check lazy lookups give the entries of deserialize_data."""
+    serial_file = tmp_path / "database.jsonl"
+    indexfile = tmp_path / "database.jsonl.index"
+    tlm_list = sorted(datafile("dbload").glob("*.gr"))
+    for headerfile in tlm_list + tlm_list[:1]:
+        serialize_data(
+            headerfile,
+            load_data(headerfile, headers=True),
+            load_data(headerfile),
+            dt_colnames=["r", "gr"],
+            serial_file=serial_file,
+            binary_arrays=headerfile == tlm_list[1],
+        )
+    assert len(indexfile.read_text().splitlines()) == len(tlm_list) + 1
+    file_data = deserialize_data(serial_file)
+    database = deserialize_data(serial_file, lazy=True)
+    assert isinstance(database, SerialDatabase)
+    assert list(database) == list(file_data)
+    assert len(database) == len(file_data)
+    for title, data in file_data.items():
+        assert database[title].keys() == data.keys()
+        for key, value in data.items():
+            assert numpy.array_equal(database[title][key], value)
+    assert isinstance(database[tlm_list[1].name]["r"], numpy.memmap)
+    with pytest.raises(KeyError):
+        database["missing.gr"]
+
+    # entries that are not indexed are found by a scan
+    indexfile.write_text(indexfile.read_text().splitlines()[0] + "\n")
+    assert dict(SerialDatabase(serial_file)).keys() == file_data.keys()
+    indexfile.unlink()
+    assert dict(SerialDatabase(serial_file)).keys() == file_data.keys()
+
+    # a database rewritten by compaction is scanned again
+    title = tlm_list[-1].name
+    compact_database(serial_file)
+    assert database[title]["r"] == file_data[title]["r"]
+    assert len(indexfile.read_text().splitlines()) == len(tlm_list)
+    database = SerialDatabase(serial_file)
+    assert database[title]["r"] == file_data[title]["r"]
+
+    with pytest.raises(UnsupportedTypeError):
+        deserialize_data(datafile("targetjson.json"), lazy=True)
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl"])
+def test_serialize_batch(tmp_path, datafile, monkeypatch, suffix):
+    """Check a batch gives the database of single serializations."""
+    serial_file = tmp_path / ("database" + suffix)
+    tlm_list = sorted(datafile("dbload").glob("*.gr"))
+    entries = [
+        (
+            headerfile,
+            load_data(headerfile, headers=True),
+            load_data(headerfile),
+        )
+        for headerfile in tlm_list
+    ]
+    new_data = serialize_batch(
+        entries[:1], serial_file, dt_colnames=["r", "gr"], show_path=False
+    )
+    assert list(new_data) == [tlm_list[0].name]
+    new_data = serialize_batch(
+        entries, serial_file, dt_colnames=["r", "gr"], show_path=False
+    )
+    assert list(new_data) == [headerfile.name for headerfile in tlm_list]
+    target_data = deserialize_data(datafile("targetjson.json"))
+    assert deserialize_data(serial_file) == target_data
+    if suffix == ".jsonl":
+        assert dict(SerialDatabase(serial_file)) == target_data
+    compact_file = tmp_path / ("compact" + suffix)
+    serialize_batch(
+        entries,
+        compact_file,
+        dt_colnames=["r", "gr"],
+        show_path=False,
+        compact=True,
+    )
+    assert deserialize_data(compact_file) == target_data
+    assert compact_file.stat().st_size < serial_file.stat().st_size
+
+    # an interrupted batch leaves the database unchanged
+    content = serial_file.read_bytes()
+
+    def interrupted():
+        yield entries[0][0], {"qmax": 0.0}, entries[0][2]
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        serialize_batch(interrupted(), serial_file)
+    assert serial_file.read_bytes() == content
+
+    # so does a failure of the commit
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(os, "replace", failing_replace)
+        with pytest.raises(OSError, match="disk full"):
+            serialize_batch(entries, serial_file)
+    assert serial_file.read_bytes() == content
+    assert list(tmp_path.glob(".tmp-*")) == []
+
+
+def _serialize_worker(serial_file, worker, batch):
+    table = numpy.full((3, 2), float(worker))
+    for i in range(5):
+        filename = f"w{worker}-{i}.gr"
+        if batch:
+            entries = [(f"{filename}-{j}", {}, table) for j in range(4)]
+            serialize_batch(entries, serial_file, lock=True)
+        else:
+            serialize_data(
+                filename, {}, table, serial_file=serial_file, lock=True
+            )
+    return
+
+
+@pytest.mark.skipif(
+    serialization.fcntl is None, reason="locking requires fcntl"
+)
+@pytest.mark.parametrize("suffix", [".json", ".jsonl"])
+@pytest.mark.parametrize("batch", [False, True])
+def test_concurrent_writers(tmp_path, suffix, batch):
+    """Check locked writes of several processes lose no entries."""
+    serial_file = tmp_path / ("database" + suffix)
+    nworkers = 4
+    with ProcessPoolExecutor(max_workers=nworkers) as executor:
+        futures = [
+            executor.submit(_serialize_worker, serial_file, worker, batch)
+            for worker in range(nworkers)
+        ]
+        for future in futures:
+            future.result()
+    file_data = deserialize_data(serial_file)
+    assert len(file_data) == nworkers * 5 * (4 if batch else 1)
+    for title, data in file_data.items():
+        worker = int(title[1 : title.index("-")])
+        assert numpy.array_equal(
+            data["data table"], numpy.full((3, 2), worker)
+        )
+    if suffix == ".jsonl":
+        assert dict(SerialDatabase(serial_file)).keys() == file_data.keys()
+    compact_database(serial_file, lock=True)
+    assert deserialize_data(serial_file).keys() == file_data.keys()
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_serialize_data_encoding(tmp_path, compact):
+    """Check the json layout of long and special float columns."""
+    serial_file = tmp_path / "database.json"
+    data_table = numpy.random.default_rng(0).random((1000, 3))
+    data_table[:3, 2] = [numpy.nan, numpy.inf, -numpy.inf]
+    hdata = {"qmax": 25.0, "counts": [1, 2.5, True], "nested": {"a": [0.5]}}
+    file_data = serialize_data(
+        "e1.gr",
+        hdata,
+        data_table,
+        dt_colnames=["r", "gr"],
+        show_path=False,
+        serial_file=serial_file,
+        compact=compact,
+    )
+    text = serial_file.read_text()
+    if compact:
+        assert "\n" not in text
+    else:
+        assert text == json.dumps(file_data, indent=2, cls=NumpyEncoder)
+    loaded = deserialize_data(serial_file)
+    assert loaded["e1.gr"]["counts"] == [1, 2.5, True]
+    assert loaded["e1.gr"]["r"] == list(data_table[:, 0])
+    assert numpy.array_equal(
+        loaded["e1.gr"]["data table"], data_table, equal_nan=True
+    )
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl"])
+@pytest.mark.parametrize("binary_arrays", [False, True])
+def test_iter_database(tmp_path, datafile, monkeypatch, suffix, binary_arrays):
+    """Check streamed entries match the loaded database."""
+    serial_file = tmp_path / ("database" + suffix)
+    entries = [
+        (
+            headerfile,
+            load_data(headerfile, headers=True),
+            load_data(headerfile),
+        )
+        for headerfile in sorted(datafile("dbload").glob("*.gr"))
+    ]
+    serialize_batch(
+        entries,
+        serial_file,
+        dt_colnames=["r", "gr"],
+        show_path=False,
+        binary_arrays=binary_arrays,
+    )
+    expected = deserialize_data(serial_file)
+    # small chunks split the values between reads
+    monkeypatch.setattr(serialization, "_CHUNK_SIZE", 7)
+    streamed = dict(iter_database(serial_file))
+    assert streamed.keys() == expected.keys()
+    for title, entry in streamed.items():
+        assert entry.keys() == expected[title].keys()
+        for key, value in entry.items():
+            assert numpy.array_equal(value, expected[title][key])
+
+    headers = dict(iter_database(serial_file, headers_only=True))
+    for title, entry in headers.items():
+        assert entry == {
+            key: value
+            for key, value in expected[title].items()
+            if key not in ("r", "gr")
+        }
+    selected = dict(iter_database(serial_file, fields=["qmax", "r"]))
+    for title, entry in selected.items():
+        assert list(entry) == ["qmax", "r"]
+        assert numpy.array_equal(entry["r"], expected[title]["r"])
+
+
+def test_iter_database_incomplete(tmp_path):
+    """Check truncated databases are reported."""
+    serial_file = tmp_path / "database.json"
+    serial_file.write_text('{"e1.gr": {"qmax": 25.0}, "e2.gr": {"qm')
+    entries = iter_database(serial_file)
+    assert next(entries) == ("e1.gr", {"qmax": 25.0})
+    with pytest.raises(ValueError):
+        next(entries)
+
+    serial_file = tmp_path / "database.jsonl"
+    serial_file.write_text('{"e1.gr": {"qmax": 25.0}}\n{"e2.gr": {"qm')
+    with pytest.warns(RuntimeWarning, match="incomplete entry"):
+        assert list(iter_database(serial_file)) == [("e1.gr", {"qmax": 25.0})]
+    with pytest.raises(UnsupportedTypeError):
+        list(iter_database(tmp_path / "database.txt"))
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+@pytest.mark.parametrize("suffix", [".json", ".jsonl"])
+def test_serialize_batch_file_mode(tmp_path, suffix):
+    """Check new databases get the mode of files created by open."""
+    serial_file = tmp_path / ("database" + suffix)
+    umask = os.umask(0o022)
+    try:
+        serialize_batch([("e1.gr", {}, numpy.zeros((2, 2)))], serial_file)
+    finally:
+        os.umask(umask)
+    assert serial_file.stat().st_mode & 0o777 == 0o644
+    # the mode of existing databases is kept
+    serial_file.chmod(0o640)
+    serialize_batch([("e2.gr", {}, numpy.zeros((2, 2)))], serial_file)
+    assert serial_file.stat().st_mode & 0o777 == 0o640
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+@pytest.mark.parametrize("lock", [False, True])
+def test_serialize_data_file_mode(tmp_path, lock):
+    """Check serialize_data creates databases readable as before."""
+    serial_file = tmp_path / "database.json"
+    umask = os.umask(0o022)
+    try:
+        serialize_data(
+            "e1.gr",
+            {},
+            numpy.zeros((2, 2)),
+            serial_file=serial_file,
+            lock=lock,
+        )
+    finally:
+        os.umask(umask)
+    assert serial_file.stat().st_mode & 0o777 == 0o644
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+
+"""Unit tests for diffpy.utils.parsers.tailreader."""
+
+import numpy as np
+
+from diffpy.utils.parsers import TailReader, load_data
+
+
+def test_TailReader(tmp_path):
+    """Check polling returns the rows appended to a growing file."""
+    filename = tmp_path / "growing.dat"
+    filename.write_text("# temperature = 300\n1 10\n2 20\n")
+    reader = TailReader(filename, minrows=3)
+    # the block is not used before it has minrows rows
+    assert reader.poll().shape == (0, 0)
+    with open(filename, "a") as fp:
+        fp.write("3 30\n4 4")
+    assert np.array_equal(reader.poll(), [[1, 10], [2, 20], [3, 30]])
+    offset = reader.offset
+    # the incomplete last line is read once it is finished
+    assert reader.poll().shape == (0, 2)
+    assert reader.offset == offset
+    with open(filename, "a") as fp:
+        fp.write("0\n\n# comment\n5 50\n")
+    assert np.array_equal(reader.poll(), [[4, 40], [5, 50]])
+    assert np.array_equal(reader.data, load_data(filename, minrows=3))
+    for i in range(6, 100):
+        with open(filename, "a") as fp:
+            fp.write(f"{i} {10 * i}\n")
+        assert np.array_equal(reader.poll(), [[i, 10 * i]])
+    assert np.array_equal(reader.data, load_data(filename, minrows=3))
+
+    # a truncated file is read from the start
+    filename.write_text("7 8 9\n" * 3)
+    assert np.array_equal(reader.poll(), [[7, 8, 9]] * 3)
+    assert np.array_equal(reader.data, [[7, 8, 9]] * 3)
+
+
+def test_TailReader_usecols(tmp_path):
+    """Check loadtxt options apply to the polled rows."""
+    filename = tmp_path / "growing.csv"
+    filename.write_text("x,y,z\n1,2,3\n")
+    reader = TailReader(filename, minrows=1, usecols=[0, 2], delimiter=",")
+    assert np.array_equal(reader.poll(), [[1, 3]])
+    with open(filename, "a") as fp:
+        fp.write("4,5,6\n")
+    assert np.array_equal(reader.poll(), [[4, 6]])
+    assert np.array_equal(reader.data, [[1, 3], [4, 6]])
@@ -1,12 +1,17 @@
 import importlib.metadata
 import json
+import multiprocessing
 import os
+import time
 from pathlib import Path
+from types import SimpleNamespace
 
 import numpy as np
 import pytest
 
+from diffpy.utils import tools
 from diffpy.utils.tools import (
+    _best_mud,
     _extend_z_and_convolve,
     check_and_build_global_config,
     compute_mud,
@@ -285,3 +290,81 @@ def test_compute_mud(tmp_path):
     expected_mud = 3
     actual_mud = compute_mud(file)
     assert actual_mud == pytest.approx(expected_mud, rel=1e-4, abs=1e-3)
+
+
+def test_compute_mud_parallel(tmp_path):
+    z_data = np.linspace(-1, 1, 50)
+    convolved_I_data = _extend_z_and_convolve(z_data, 1, 0.1, 0, 1e5, 3, 0)
+    file = tmp_path / "testfile"
+    np.savetxt(file, np.column_stack([z_data, convolved_I_data]))
+
+    # seeded fits give the same result in worker processes
+    serial_mud = compute_mud(file, restarts=1, seed=7)
+    parallel_mud = compute_mud(file, restarts=1, seed=7, workers=2)
+    assert parallel_mud == serial_mud
+    assert parallel_mud == pytest.approx(3, rel=1e-4, abs=1e-3)
+    with pytest.raises(ValueError):
+        compute_mud(file, restarts=0)
+
+
+@pytest.mark.parametrize(
+    "agree, expected",
+    [
+        # all fits are used
+        (None, 3.0),
+        # the first fit agrees with itself
+        (1, 1.0),
+        # the third fit is the best one and the fourth agrees with it
+        (2, 3.0),
+    ],
+)
+def test_best_mud(agree, expected):
+    fits = iter([(1.0, 0.5), (2.0, 0.4), (3.0, 0.1), (3.001, 0.2), (4, 9)])
+    assert _best_mud(fits, agree=agree, rtol=1e-3) == expected
+    if agree is not None:
+        # the fits after the agreement were not run
+        assert len(list(fits)) == 5 - {1: 1, 2: 4}[agree]
+
+
+def _timed_fit(z_data, I_data, seed=None):
+    """Stand-in fit where only the first fit finishes quickly."""
+    if seed.spawn_key[-1] == 0:
+        time.sleep(0.1)
+        return 3.0, 0.1
+    time.sleep(60)
+    return 2.0, 0.2
+
+
+@pytest.mark.parametrize("method", multiprocessing.get_all_start_methods())
+def test_compute_mud_parallel_early_stop(tmp_path, monkeypatch, method):
+    file = tmp_path / "testfile"
+    np.savetxt(file, np.column_stack([np.linspace(-1, 1, 50), np.ones(50)]))
+    # the workers unpickle the stub by its name in this module, so it runs
+    # with any start method, not only in forked copies of this process
+    monkeypatch.setattr(tools, "_compute_single_mud", _timed_fit)
+    monkeypatch.setattr(
+        multiprocessing, "Pool", multiprocessing.get_context(method).Pool
+    )
+    start = time.perf_counter()
+    assert compute_mud(file, restarts=4, workers=2, seed=1, agree=1) == 3.0
+    # the running fits were terminated
+    assert time.perf_counter() - start < 30
+
+
+def test_compute_mud_global_seed(tmp_path, monkeypatch):
+    file = tmp_path / "testfile"
+    np.savetxt(file, np.column_stack([np.linspace(-1, 1, 50), np.ones(50)]))
+    seeds = []
+
+    def annealing(func, bounds, args=(), seed=None):
+        seeds.append(seed)
+        x = [np.random.uniform(low, high) for low, high in bounds]
+        return SimpleNamespace(x=np.array(x))
+
+    monkeypatch.setattr(tools, "dual_annealing", annealing)
+    # without a seed the fits follow the global numpy random state
+    np.random.seed(7)
+    first = compute_mud(file, restarts=3)
+    np.random.seed(7)
+    assert compute_mud(file, restarts=3) == first
+    assert seeds == [None] * 6